@@ -1,47 +1,90 @@
 import asyncio
 import importlib
-import traceback
+import logging
 import uuid
 from pathlib import Path
-from typing import Callable
-
-import aiohttp
-
-from arcane.dataclasses import Message, Command, User
-from arcane.models import Channel
-from arcane.modules import printt, parser, REGEX
-from arcane.modules.api.twitch import get_token_info
+from typing import Callable, Awaitable
+
+from arcane.dataclasses import Message, Command, User, Channel as ChatChannel
+from arcane.models import channel_repository
+from arcane.modules import log, printt, REGEX
+from arcane.modules.api import twitch, valorant
+from arcane.modules.connection import ConnectionPool
+from arcane.modules.cooldowns import CommandCooldown, command_cooldown_manager
 from arcane.modules.errors import AuthenticationError
-from arcane.settings import DEBUG, ACCESS_TOKEN, CLIENT_ID
+from arcane.modules.history import MessageHistory
+from arcane.modules.outbound import OutboundScheduler
+from arcane.modules.parser import Line
+from arcane.modules.prewarm import StatsPrewarmer
+from arcane.modules.router import CommandRouter
+from arcane.modules.streams import StreamPoller, StreamState
+from arcane.modules.workers import WorkerPool
+from arcane.settings import (DEBUG, ACCESS_TOKEN, CLIENT_ID, PREFIXES, WORKERS, QUEUE_SIZE, MESSAGE_TTL,
+                             STREAM_POLL_INTERVAL, SHARDS, CHANNELS_PER_SHARD, HISTORY_SIZE, HISTORY_BUDGET,
+                             PREWARM_MIN_INTERVAL, PREWARM_MAX_INTERVAL)
 
 
 class Arcane:
     def __init__(self) -> None:
         self._host: str = 'wss://irc-ws.chat.twitch.tv:443'
         self._loop: asyncio.AbstractEventLoop | None = None or asyncio.get_event_loop()
-        self._websocket = None
         self._token: str = ACCESS_TOKEN
         self.username: str | None = None
         self.client_id: str = CLIENT_ID
         self.user_id: int | None = None
-        self.prefix: str = '!'
-        self.channels: list[str] = Channel.get_all_channel_names()
+        channel_repository.load()
+        self.channels: list[str] = channel_repository.names()
         self.commands: dict = {}
         self.hidden_commands: dict = {}
         self.aliases: dict = {}
-        self.messages: list[Message] = []
+        self.router = CommandRouter(PREFIXES)
+        for channel in self.channels:
+            self.router.set_channel_prefixes(channel, channel_repository.get(channel).prefixes)
+        self.cooldowns = command_cooldown_manager
+        # Set by the supervisor so GLOBAL cooldowns hold across worker processes.
+        self.global_cooldowns: CommandCooldown | None = None
+        self.messages = MessageHistory(per_channel=HISTORY_SIZE, max_messages=HISTORY_BUDGET)
+        self._pool = ConnectionPool(self, shards=SHARDS, channels_per_shard=CHANNELS_PER_SHARD)
+        self._outbound = OutboundScheduler(self._pool.send, self._pool.connected)
+        self.streams = StreamPoller(self, interval=STREAM_POLL_INTERVAL)
+        self.prewarmer = StatsPrewarmer(self, min_interval=PREWARM_MIN_INTERVAL, max_interval=PREWARM_MAX_INTERVAL)
+        self._workers = WorkerPool(self.action_handler, concurrency=WORKERS, max_pending=QUEUE_SIZE)
+        self._listeners: dict[str, list[Callable[[Line], Awaitable[None]]]] = {}
+        self._handlers: dict[str, Callable[[Line], Awaitable[None]]] = {
+            'PRIVMSG': self._handle_privmsg,
+            'WHISPER': self._handle_whisper,
+            'JOIN': self._handle_join,
+            'PART': self._handle_part,
+            'MODE': self._handle_mode,
+            'USERSTATE': self._handle_userstate,
+            'ROOMSTATE': self._handle_roomstate,
+            'NOTICE': self._handle_notice,
+            'CLEARCHAT': self._handle_clearchat,
+            'HOSTTARGET': self._handle_hosttarget,
+            'USERNOTICE': self._handle_usernotice,
+            'CAP': self._handle_cap,
+        }
 
     def command(*args, **kwargs) -> Callable[[Message], None]:
         return Command(*args, **kwargs)
 
-    async def reply(self, parent: uuid, channel: str, message: str) -> None:
+    def event(self, action: str) -> Callable:
+        """Register a coroutine that receives every parsed line with the given IRC command."""
+        def decorator(func: Callable[[Line], Awaitable[None]]) -> Callable[[Line], Awaitable[None]]:
+            self._listeners.setdefault(action.upper(), []).append(func)
+            return func
+        return decorator
+
+    async def reply(self, parent: uuid, channel: str, message: str, recipient: str | None = None) -> None:
         if len(message) > 500:
             raise Exception(
                 'The maximum amount of characters in one message is 500,'
                 f' you tried to send {len(message)} characters')
 
         message = message.replace('\n', ' ')
-        await self._send_command(f'@reply-parent-msg-id={parent} PRIVMSG #{channel} :{message}')
+        self._outbound.enqueue(
+            channel, message, f'@reply-parent-msg-id={parent} PRIVMSG #{channel} :{message}', ttl=MESSAGE_TTL,
+            recipient=recipient, reply_to=str(parent))
 
     async def send(self, channel: str, message: str) -> None:
         if len(message) > 500:
@@ -65,26 +108,33 @@ class Arcane:
 
         await self._send_privmsg(channel, '.me ' + message)
 
-    async def _pong(self):
-        await self._send_command('PONG :tmi.twitch.tv')
-
     async def _send_privmsg(self, channel: str, message: str) -> None:
         message = message.replace('\n', ' ')
-        await self._send_command(f'PRIVMSG #{channel} :{message}')
+        self._outbound.enqueue(channel, message, f'PRIVMSG #{channel} :{message}')
 
-    async def _send_command(self, command: str) -> None:
-        await self._websocket.send_str(command + '\r\n')
+    async def _send_command(self, command: str, channel: str | None = None) -> None:
+        await self._pool.send(command, channel)
 
     async def join_channel(self, channel: str) -> None:
-        await self._send_command(f'JOIN #{channel}')
+        if not channel_repository.owns(channel):
+            # Joined by the worker that owns it once the forwarded write arrives.
+            return
+        if channel not in self.channels:
+            self.channels.append(channel)
+        await self._pool.join(channel)
 
     async def part_channel(self, channel: str) -> None:
-        await self._send_command(f'PART #{channel}')
-
-    async def _cache(self, message):
-        self.messages.append(message)
-        if len(self.messages) > 100:
-            self.messages.pop(0)
+        if not channel_repository.owns(channel):
+            return
+        if channel in self.channels:
+            self.channels.remove(channel)
+        self.router.set_channel_prefixes(channel, None)
+        self.messages.remove_channel(channel)
+        await self._pool.part(channel)
+
+    async def _cache(self, message: Message | None) -> None:
+        if message:
+            self.messages.add(message)
 
     async def _load_extensions(self) -> None:
         extension_paths = [p.stem for p in Path('./arcane/extensions/').glob('*.py')]
@@ -100,30 +150,24 @@ class Arcane:
 
     async def _connect(self) -> None:
         try:
-            data = await get_token_info(self._token)
+            data = await twitch.get_token_info(self._token)
         except AuthenticationError:
             raise AuthenticationError('Invalid or unauthorized Access Token passed.')
 
         self.username = data['login']
         self.user_id = data['user_id']
 
-        session = aiohttp.ClientSession()
-        self._websocket = await session.ws_connect(url=self._host, heartbeat=30.0)
+        await valorant.start_session()
 
-        await self.authenticate()
-        await self.event_ready()
+        # Commands and the outbound queue are ready before the first line arrives;
+        # the channels are joined in the background at the JOIN rate limit.
         await self._load_extensions()
-        await self._loop_for_messages()
-
-    async def authenticate(self) -> None:
-        await self._send_command(f'PASS oauth:{self._token}')
-        await self._send_command(f'NICK {self.username}')
-
-        for cap in ('tags', 'commands', 'membership'):
-            await self._send_command(f'CAP REQ :twitch.tv/{cap}')
-
-        for channel in self.channels:
-            await self.join_channel(channel)
+        self._outbound.start()
+        await self._pool.start(self.channels)
+        self.streams.start()
+        self.prewarmer.start()
+        await self.event_ready()
+        await self._pool.wait_closed()
 
     async def event_ready(self) -> None:
         if DEBUG:
@@ -134,10 +178,11 @@ class Arcane:
         channel_connected = ', '.join(
             [f'[link=https://twitch.tv/{channel}][yellow]@{channel}[/link][/yellow]' for channel in
              self.channels])
-        printt.success(f'Connected to {channel_connected}')
+        printt.success(f'Joining {channel_connected}')
         printt.success('Have a nice day!\n')
 
     def run(self) -> None:
+        log.start()
         try:
             self._loop.run_until_complete(self._connect())
             self._loop.run_forever()
@@ -146,136 +191,139 @@ class Arcane:
         finally:
             self._loop.run_until_complete(self.stop())
             self._loop.close()
+            log.stop()
 
     async def stop(self) -> None:
-        if self._websocket:
-            await self._websocket.close()
+        await self._workers.stop()
+        await self._outbound.stop()
+        await self.streams.stop()
+        await self.prewarmer.stop()
+        await valorant.close_session()
+        await twitch.close_session()
+        await self._pool.close()
+        channel_repository.close()
 
     @staticmethod
     async def parse_error(e: Exception) -> None:
-        traceback_str = ''.join(traceback.format_tb(e.__traceback__))
-        printt.error(f'Ignoring exception in traceback:\n{traceback_str}{e}')
+        log.logger.error('Ignoring exception: %s', e, exc_info=e)
 
-    async def action_handler(self, message: str) -> None:
-        tags, action, data, content, channel = await parser(message)
+    async def action_handler(self, line: Line) -> None:
+        action = line.action
+        if not action:
+            return
 
         try:
-            if not action:
-                return
-
-            elif action == 'PING':
-                await self._pong()
-
-            elif action == 'PRIVMSG':
-                message_object = Message.parse(self, message)
-
-                if message_object and self.username != message_object.author:
-                    channel_name = (f'[purple3][@[link=https://twitch.tv/{message_object.channel.name}]'
-                                    f'{message_object.channel.name}][/link][/purple3]')
-                    message_user = (f'[{message_object.author.color}][link=https://twitch.tv/{message_object.author.name}]'
-                                    f'{message_object.author.display_name}[/link][/{message_object.author.color}]')
-                    printt.printt(f'[bold][blue][{message_object.timestamp}][/blue] {channel_name} {message_user}[/]: '
-                                  f'[white]{message_object.content}')
-
-                    if message_object.content.startswith(self.prefix):
-                        command = message_object.content.split()[0][len(self.prefix):]
-                        if command in self.commands:
-                            await self.commands[command].execute_command(message_object)
-                        elif command in self.hidden_commands:
-                            await self.hidden_commands[command].execute_command(message_object)
-                        elif command in self.aliases:
-                            command = self.aliases[command]
-                            await self.commands[command].execute_command(message_object)
-
-                await self._cache(message_object)
-                await self.event_message(message_object)
-
-            elif action == 'WHISPER':
-                message_object = Message.parse(self, message)
-                await self._cache(message_object)
-                await self.event_private_message(message_object)
-
-            elif action == 'JOIN':
-                sender = REGEX['author'].match(data).group('author')
-                user = User(name=sender, channel=channel)
-                await self.event_user_join(user)
-
-            elif action == 'PART':
-                sender = REGEX['author'].match(data).group('author')
-                user = User(name=sender, channel=channel)
-                await self.event_user_leave(user)
-
-            elif action == 'MODE':
-                content_data = REGEX['mode'].match(content)
-                mode = content_data.group('mode')
-                user = content_data.group('user')
-                user_object = User(name=user, channel=channel)
-
-                if mode == '+':
-                    await self.event_user_op(user_object)
-                else:
-                    await self.event_user_deop(user_object)
-
-            elif action == 'USERSTATE':
-                if tags['mod'] == 1:
-                    self.is_mod = True
-                else:
-                    self.is_mod = False
-                user = User(name=self.username, channel=channel, tags=tags)
-                await self.event_userstate(user)
-
-            elif action == 'ROOMSTATE':
-                await self.event_roomstate(channel, tags)
-
-            elif action == 'NOTICE':
-                await self.event_notice(channel, tags)
-
-            elif action == 'CLEARCHAT':
-                if not content:
-                    await self.event_clear(channel)
-                else:
-                    user = User(name=content, channel=channel)
-                    if 'ban-duration' in tags.keys():
-                        await self.event_timeout(user, tags)
-                    else:
-                        await self.event_ban(user, tags)
-
-            elif action == 'HOSTTARGET':
-                m = REGEX['host'].match(content)
-                hchannel = m.group('channel')
-                viewers = m.group('count')
-                if channel == '-':
-                    await self.event_host_stop(channel, viewers)
-                else:
-                    await self.event_host_start(channel, hchannel, viewers)
-
-            elif action == 'USERNOTICE':
-                message = content or ''
-                user = tags['login']
-                await self.event_subscribe(Message(message, user, channel, tags), tags)
-
-            elif action == 'CAP':
-                return
-            else:
-                printt.printt('Unknown event:', action)
-                printt.printt(message)
+            handler = self._handlers.get(action)
+            if handler:
+                await handler(line)
+            elif not action.isdigit() and action not in self._listeners:
+                log.irc.info('Unknown event: %s', action, extra={'raw': line.raw})
+
+            for listener in self._listeners.get(action, ()):
+                await listener(line)
 
         except Exception as e:
             await self.parse_error(e)
 
-    async def _loop_for_messages(self) -> None:
-        while True:
-            received_msg = await self._websocket.receive()
-            if received_msg.type == aiohttp.WSMsgType.TEXT:
-                message = received_msg.data.rstrip()
-
-                if not message:
-                    continue
-
-                if DEBUG:
-                    printt.printt(message)
+    async def _handle_privmsg(self, line: Line) -> None:
+        message_object = Message.parse(self, line)
+
+        if message_object and self.username != message_object.author.name:
+            if log.chat.isEnabledFor(logging.INFO):
+                author = message_object.author
+                log.chat.info(message_object.content, extra={
+                    'channel': message_object.channel.name,
+                    'user': author.name,
+                    'display_name': author.display_name,
+                    'color': author.color,
+                    'timestamp': message_object.timestamp,
+                })
+
+            route = self.router.match(message_object.channel.name, message_object.content)
+            if route:
+                command, tokens = route
+                await command.execute_command(message_object, tokens)
+
+        await self._cache(message_object)
+        await self.event_message(message_object)
+
+    async def _handle_whisper(self, line: Line) -> None:
+        message_object = Message.parse(self, line)
+        await self._cache(message_object)
+        await self.event_private_message(message_object)
+
+    async def _handle_join(self, line: Line) -> None:
+        user = User(name=line.author, channel=line.channel)
+        await self.event_user_join(user)
+
+    async def _handle_part(self, line: Line) -> None:
+        user = User(name=line.author, channel=line.channel)
+        await self.event_user_leave(user)
+
+    async def _handle_mode(self, line: Line) -> None:
+        content_data = REGEX['mode'].match(line.content)
+        mode = content_data.group('mode')
+        user = content_data.group('user')
+        user_object = User(name=user, channel=line.channel)
+
+        if mode == '+':
+            await self.event_user_op(user_object)
+        else:
+            await self.event_user_deop(user_object)
+
+    async def _handle_userstate(self, line: Line) -> None:
+        user = User(name=self.username, channel=line.channel, tags=line.raw_tags)
+        self.is_mod = user.is_mod
+        self._outbound.set_moderator(line.channel, self.is_mod)
+        await self.event_userstate(user)
+
+    async def _handle_roomstate(self, line: Line) -> None:
+        await self.event_roomstate(line.channel, line.tags)
+
+    async def _handle_notice(self, line: Line) -> None:
+        await self.event_notice(line.channel, line.tags)
+
+    async def _handle_clearchat(self, line: Line) -> None:
+        channel = line.channel
+        content = line.content
+        if not content:
+            await self.event_clear(channel)
+        else:
+            user = User(name=content, channel=channel)
+            tags = line.tags
+            if 'ban-duration' in tags:
+                await self.event_timeout(user, tags)
+            else:
+                await self.event_ban(user, tags)
+
+    async def _handle_hosttarget(self, line: Line) -> None:
+        channel = line.channel
+        m = REGEX['host'].match(line.content)
+        hchannel = m.group('channel')
+        viewers = m.group('count')
+        if hchannel == '-':
+            await self.event_host_stop(channel, viewers)
+        else:
+            await self.event_host_start(channel, hchannel, viewers)
+
+    async def _handle_usernotice(self, line: Line) -> None:
+        channel = line.channel
+        tags = line.tags
+        message = Message(
+            content=line.content or '',
+            author=User(name=tags.get('login'), channel=channel, tags=tags),
+            channel=ChatChannel(name=channel),
+            bot=self,
+            tags=tags,
+        )
+        await self.event_subscribe(message, tags)
+
+    async def _handle_cap(self, line: Line) -> None:
+        pass
 
-                await self.action_handler(message)
+    async def receive(self, line: Line) -> None:
+        """Entry point for lines read by any connection in the pool."""
+        await self._workers.submit(line.channel, line)
 
     async def event_message(self, message: Message) -> None:
         pass
@@ -321,3 +369,9 @@ class Arcane:
 
     async def event_subscribe(self, message: Message, tags) -> None:
         pass
+
+    async def event_stream_online(self, stream: StreamState) -> None:
+        pass
+
+    async def event_stream_offline(self, stream: StreamState) -> None:
+        pass
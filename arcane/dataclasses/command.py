@@ -1,15 +1,17 @@
+import asyncio
 import inspect
 from typing import TYPE_CHECKING
 
 from arcane.dataclasses import Message
-from arcane.modules.cooldowns import command_cooldown_manager
+from arcane.modules.cooldowns import BucketType, bucket_key
 
 if TYPE_CHECKING:
     from arcane import Arcane
 
 
 class Command:
-    __slots__ = ('_bot', '_name', '_aliases', '_permissions', '_hidden', '_cooldown', '_subcommands', 'func')
+    __slots__ = ('_bot', '_name', '_aliases', '_permissions', '_hidden', '_cooldown', '_cooldown_rate',
+                 '_cooldown_bucket', '_cooldown_key', '_subcommands', '_params', '_converters', '_required', 'func')
 
     def __init__(self, *args, **kwargs) -> None:
         self._bot: Arcane = args[0]
@@ -18,15 +20,19 @@ class Command:
         self._permissions = kwargs.get('permissions', [])
         self._hidden: bool = kwargs.get('hidden', False)
         self._cooldown: float = kwargs.get('cooldown', 15.0)
+        self._cooldown_rate: int = kwargs.get('cooldown_rate', 1)
+        self._cooldown_bucket: BucketType = kwargs.get('cooldown_bucket', BucketType.CHANNEL)
         self._subcommands = {}
 
         if self._hidden:
             self._bot.hidden_commands[self._name] = self
         else:
             self._bot.commands[self._name] = self
+        self._bot.router.add(self._name, self)
 
         for alias in self._aliases:
             self._bot.aliases[alias] = self._name
+            self._bot.router.add(alias, self)
 
     def __repr__(self):
         return (f'<Command name: {self._name}, aliases: {self._aliases}, permissions: {self._permissions}, '
@@ -34,8 +40,26 @@ class Command:
 
     def __call__(self, func):
         self.func = func
+        self._compile(func)
         return self
 
+    def _compile(self, func) -> None:
+        """Build the invocation plan once, when the decorator runs."""
+        params = list(inspect.signature(func).parameters.values())[1:]
+        self._params = tuple(param.name for param in params)
+        self._converters = tuple(self._converter(param.annotation) for param in params)
+        self._required = sum(1 for param in params if param.default is param.empty)
+        # Qualified by module so same-named functions in different extensions keep separate cooldowns.
+        self._cooldown_key = f'{func.__module__}.{func.__qualname__}'
+
+    @staticmethod
+    def _converter(annotation):
+        if annotation is inspect.Parameter.empty or isinstance(annotation, str):
+            return None
+        if isinstance(annotation, type) and issubclass(str, annotation):
+            return None
+        return annotation
+
     def subcommand(self, *args, **kwargs):
         return SubCommand(self, *args, **kwargs)
 
@@ -51,76 +75,76 @@ class Command:
         }
         return [role for role, has_role in roles.items() if has_role]
 
-    async def execute_command(self, message: Message) -> None:
+    def consume_cooldown(self, message: Message) -> bool:
+        """Atomically check and use this command's cooldown for ``message``."""
+        key = bucket_key(self._cooldown_bucket, self._cooldown_key, message.channel.name, message.author.name)
+        return not self._bot.cooldowns.consume(key, self._cooldown_rate, self._cooldown)
+
+    async def consume_global_cooldown(self, message: Message) -> bool:
+        """``consume_cooldown`` against the table shared by every worker process."""
+        key = bucket_key(self._cooldown_bucket, self._cooldown_key, message.channel.name, message.author.name)
+        # A blocking call to the supervisor's manager, so it is made from a thread.
+        return not await asyncio.to_thread(
+            self._bot.global_cooldowns.consume, key, self._cooldown_rate, self._cooldown)
+
+    async def execute_command(self, message: Message, tokens: list[str] | None = None) -> None:
         if not self._permissions:
-            await self.run(message)
+            await self.run(message, tokens)
         else:
             user_roles = self.check_user_roles(message)
             if any(role in user_roles for role in self._permissions):
-                await self.run(message)
-
-    async def run(self, message: Message) -> None:
-        message_channel = message.channel.name
-        args = message.content[len(self._bot.prefix):].split(' ')[1:]
-
-        args_name = inspect.getfullargspec(self.func)[0][1:]
-
-        if len(args) > len(args_name):
-            args[len(args_name)-1] = ' '.join(args[len(args_name)-1:])
-
-            args = args[:len(args_name)]
-
-        ann = self.func.__annotations__
-
-        for x in range(len(args_name)):
-            try:
-                v = args[x]
-                k = args_name[x]
-
-                if not isinstance(v, ann[k]):
-                    v = ann[k](v)
-
-                args[x] = v
-            except IndexError:
-                break
+                await self.run(message, tokens)
+
+    def bind(self, tokens: list[str], start: int) -> list:
+        """Fit ``tokens[start:]`` to the compiled signature.
+
+        The last parameter takes the rest of the message and every argument goes
+        through its annotation's converter.
+        """
+        args = tokens[start:]
+        arity = len(self._params)
+        if len(args) > arity:
+            args = args[:arity - 1] + [' '.join(args[arity - 1:])] if arity > 0 else []
+        if len(args) < self._required:
+            raise Exception(f'Not enough arguments for {self._name}, required arguments:'
+                            f' {", ".join(self._params)}')
+
+        converters = self._converters
+        for index, arg in enumerate(args):
+            converter = converters[index]
+            if converter is not None:
+                args[index] = converter(arg)
+        return args
+
+    async def run(self, message: Message, tokens: list[str] | None = None, start: int = 1) -> None:
+        if tokens is None:
+            tokens = message.content.split(' ')
 
         if self._subcommands:
-            try:
-                subcomm = args.pop(0).split(' ')[0]
-            except Exception:
-                if command_cooldown_manager.can_use_command(message_channel, self.func, self._cooldown):
-                    command_cooldown_manager.update_command_cooldown(message_channel, self.func)
-                    await self.func(message, *args)
-                return
-            if subcomm in self._subcommands:
-                c = message.content.split(' ')
-                content = ' '.join(c[1:])
-                await self._subcommands[subcomm].run(Message(
-                    content=content,
+            subcommand = self._subcommands.get(tokens[start]) if len(tokens) > start else None
+            if subcommand:
+                await subcommand.run(Message(
+                    content=' '.join(tokens[start:]),
                     author=message.author,
                     channel=message.channel,
                     bot=self._bot,
                     tags=message.tags,
-                ))
-            else:
-                if command_cooldown_manager.can_use_command(message_channel, self.func, self._cooldown):
-                    command_cooldown_manager.update_command_cooldown(message_channel, self.func)
-                    await self.func(message, *args)
+                ), tokens, start + 1)
+                return
+
+        # Without a matching subcommand the parent binds every argument itself.
+        args = self.bind(tokens, start)
+        if self._cooldown_bucket is BucketType.GLOBAL and self._bot.global_cooldowns is not None:
+            allowed = await self.consume_global_cooldown(message)
         else:
-            try:
-                if command_cooldown_manager.can_use_command(message_channel, self.func, self._cooldown):
-                    command_cooldown_manager.update_command_cooldown(message_channel, self.func)
-                    await self.func(message, *args)
-            except TypeError as e:
-                if len(args) < len(args_name):
-                    raise Exception(f'Not enough arguments for {self._name}, required arguments:'
-                                    f' {", ".join(args_name)}')
-                else:
-                    raise e
+            allowed = self.consume_cooldown(message)
+        if allowed:
+            await self.func(message, *args)
 
 
 class SubCommand(Command):
-    __slots__ = ('_parent', '_name', '_aliases', '_permissions', '_cooldown', '_bot', '_subcommands')
+    __slots__ = ('_parent', '_name', '_aliases', '_permissions', '_cooldown', '_cooldown_rate', '_cooldown_bucket',
+                 '_bot', '_subcommands')
 
     def __init__(self, *args, **kwargs) -> None:
         self._parent: Command = args[0]
@@ -128,6 +152,8 @@ class SubCommand(Command):
         self._aliases: list[Command] = kwargs.get('aliases', [])
         self._permissions: list[str] = kwargs.get('permissions', [])
         self._cooldown: float = kwargs.get('cooldown', 15.0)
+        self._cooldown_rate: int = kwargs.get('cooldown_rate', 1)
+        self._cooldown_bucket: BucketType = kwargs.get('cooldown_bucket', BucketType.CHANNEL)
         self._bot: Arcane = self._parent._bot
         self._subcommands = {}
         self._parent._subcommands[self._name] = self
@@ -2,39 +2,48 @@ import datetime
 from typing import TYPE_CHECKING, Optional
 
 from arcane.dataclasses import User, Channel
-from arcane.modules import REGEX
+from arcane.modules.parser import Line, find_tag, parse_tags
 
 if TYPE_CHECKING:
     from arcane import Arcane
 
 
 class Message:
-    __slots__ = ('content', '_author', '_channel', '_bot', '_tags', 'first', '_id', '_timestamp')
+    __slots__ = ('content', '_author', '_channel', '_bot', '_tags', '_first', '_id', '_timestamp')
 
     def __init__(self, *args, **kwargs) -> None:
         self.content: str = kwargs.get('content')
         self._author: User = kwargs.get('author')
         self._channel: Channel = kwargs.get('channel')
         self._bot: Arcane = kwargs.get('bot')
-        self._tags: dict[str, str] = kwargs.get('tags')
-
-        self.first: bool = False
-        if self._tags:
-            first = self._tags.get('first-msg')
-            if first == '1':
-                self.first = True
-
-        try:
-            self._id: str = self._tags['id']
-            self._timestamp: str = self._tags['tmi-sent-ts']
-        except KeyError:
-            self._id: None = None
-            self._timestamp: datetime = datetime.datetime.now().timestamp() * 1000
+        self._tags: dict[str, str] | str | None = kwargs.get('tags')
+
+        self._first: bool | None = None
+        self._id: str | None = None
+        self._timestamp: str | float | None = None
+        if not self._tags:
+            self._timestamp = datetime.datetime.now().timestamp() * 1000
+
+    def _tag(self, key: str) -> str | None:
+        tags = self._tags
+        if not tags:
+            return None
+        if isinstance(tags, str):
+            return find_tag(tags, key)
+        return tags.get(key)
 
     @property
     def id(self) -> str:
+        if self._id is None:
+            self._id = self._tag('id')
         return self._id
 
+    @property
+    def first(self) -> bool:
+        if self._first is None:
+            self._first = self._tag('first-msg') == '1'
+        return self._first
+
     @property
     def author(self) -> 'User':
         return self._author
@@ -45,41 +54,42 @@ class Message:
 
     @property
     def tags(self) -> dict:
+        if isinstance(self._tags, str):
+            self._tags = parse_tags(self._tags)
         return self._tags
 
     @property
     def timestamp(self) -> datetime.datetime:
+        if self._timestamp is None:
+            self._timestamp = self._tag('tmi-sent-ts') or datetime.datetime.now().timestamp() * 1000
         return datetime.datetime.utcfromtimestamp(int(self._timestamp) / 1000)
 
     @classmethod
-    def parse(cls, bot, msg) -> Optional['Message']:
-        match = REGEX['message'].match(msg)
-        if match:
-            tags = {}
-            for part in match['tags'].split(';'):
-                k, v = part.split('=', 1)
-                tags[k] = v
-
-            return cls(
-                content=match['message'],
-                author=User(
-                    name=match['author'],
-                    channel=match['channel'],
-                    tags=tags,
-                ),
-                channel=Channel(
-                    name=match['channel'],
-                ),
-                bot=bot,
-                tags=tags,
-            )
-        return None
+    def parse(cls, bot, line: Line) -> Optional['Message']:
+        channel = line.channel
+        content = line.content
+        if channel is None or content is None:
+            return None
+
+        return cls(
+            content=content,
+            author=User(
+                name=line.author,
+                channel=channel,
+                tags=line.raw_tags,
+            ),
+            channel=Channel(
+                name=channel,
+            ),
+            bot=bot,
+            tags=line.raw_tags,
+        )
 
     async def send(self, message: str) -> None:
         await self._bot.send(self.channel.name, message)
 
     async def reply(self, message: str) -> None:
-        await self._bot.reply(self.id, self.channel.name, message)
+        await self._bot.reply(self.id, self.channel.name, message, self.author.name)
 
     async def me(self, message: str) -> None:
         await self._bot.me(self.channel.name, message)
@@ -3,6 +3,9 @@ import struct
 
 from arcane import settings
 from arcane.dataclasses import Channel
+from arcane.modules.parser import find_tag
+
+_UNSET = object()
 
 
 def parse_color(s: str) -> tuple[int, int, int]:
@@ -25,38 +28,32 @@ class User:
                  '_is_mod', '_is_sub', '_is_turbo', '_is_vip',)
 
     def __init__(self, **kwargs) -> None:
-        self._tags: dict[str, str] | None = kwargs.get('tags')
+        self._tags: dict[str, str] | str | None = kwargs.get('tags')
         self._name: str = kwargs.get('name')
         self._channel: str = kwargs.get('channel') or self._name
 
-        self._cached_badges: dict[str, str] | None = None
-
-        self._id: str | None = None
-        self._display_name: str | None = None
-        self._color: str | None = None
-        self._badges: str | None = None
-        self._is_mod: bool | None = None
-        self._is_sub: bool | None = None
-        self._is_turbo: bool | None = None
-        self._is_vip: bool | None = None
-
-        if self._tags:
-            self._id: str | None = self._tags.get('user-id')
-            self._display_name: str | None = self._tags.get('display-name')
-            self._color: str | None = self._tags.get('color')
-            self._badges: str | None = self._tags.get('badges')
-            self._is_mod: bool | None = self._tags.get('mod') == 1
-            self._is_sub: bool | None = self._tags.get('subscriber') == 1
-            self._is_turbo: bool | None = self._tags.get('turbo') == 1
-            self._is_vip: bool | None = bool(self._tags.get('vip', 0))
-
-            if self._badges:
-                self._cached_badges: dict[str, str] | None = (
-                    dict([badge.split('/') for badge in self._badges.split(',')]))
+        self._cached_badges: dict[str, str] | None = _UNSET
+
+        self._id: str | None = _UNSET
+        self._display_name: str | None = _UNSET
+        self._color: str | None = _UNSET
+        self._badges: str | None = _UNSET
+        self._is_mod: bool | None = _UNSET
+        self._is_sub: bool | None = _UNSET
+        self._is_turbo: bool | None = _UNSET
+        self._is_vip: bool | None = _UNSET
 
     def __repr__(self):
         return f'<Chatter name: {self._name}, channel: {self._channel}>'
 
+    def _tag(self, key: str) -> str | None:
+        tags = self._tags
+        if not tags:
+            return None
+        if isinstance(tags, str):
+            return find_tag(tags, key)
+        return tags.get(key)
+
     @property
     def channel(self) -> Channel:
         return Channel(name=self._channel)
@@ -67,14 +64,22 @@ class User:
 
     @property
     def badges(self) -> dict:
+        if self._cached_badges is _UNSET:
+            self._badges = self._tag('badges')
+            self._cached_badges = (
+                dict(badge.split('/', 1) for badge in self._badges.split(',')) if self._badges else None)
         return self._cached_badges.copy() if self._cached_badges else {}
 
     @property
     def display_name(self) -> str | None:
+        if self._display_name is _UNSET:
+            self._display_name = self._tag('display-name')
         return self._display_name
 
     @property
     def id(self) -> str | None:
+        if self._id is _UNSET:
+            self._id = self._tag('user-id')
         return self._id
 
     @property
@@ -83,15 +88,17 @@ class User:
 
     @property
     def mention(self) -> str:
-        return f'@{self._display_name}'
+        return f'@{self.display_name}'
 
     @property
     def color(self) -> str:
+        if self._color is _UNSET:
+            self._color = self._tag('color')
         return self._color
 
     @property
     def color_rgb(self) -> tuple[int, int, int]:
-        return parse_color(self._tags['color']) if self._tags['color'] else _gen_color(self.display_name)
+        return parse_color(self.color) if self.color else _gen_color(self.display_name)
 
     @property
     def is_broadcaster(self) -> bool:
@@ -99,7 +106,9 @@ class User:
 
     @property
     def is_mod(self) -> bool | None:
-        return True if self._is_mod == 1 else self.channel.name == self.name.lower()
+        if self._is_mod is _UNSET:
+            self._is_mod = self._tag('mod') == '1'
+        return True if self._is_mod else self.channel.name == self.name.lower()
 
     @property
     def is_moderator(self) -> bool | None:
@@ -107,14 +116,20 @@ class User:
 
     @property
     def is_vip(self) -> bool | None:
+        if self._is_vip is _UNSET:
+            self._is_vip = self._tag('vip') == '1'
         return self._is_vip
 
     @property
     def is_turbo(self) -> bool | None:
+        if self._is_turbo is _UNSET:
+            self._is_turbo = self._tag('turbo') == '1'
         return self._is_turbo
 
     @property
     def is_subscriber(self) -> bool | None:
+        if self._is_sub is _UNSET:
+            self._is_sub = self._tag('subscriber') == '1'
         return self._is_sub or 'founder' in self.badges
 
     @property
@@ -123,4 +138,4 @@ class User:
 
     @property
     def is_owner(self) -> bool | None:
-        return (self._id == settings.OWNER_ID) if self._id else False
+        return (self.id == settings.OWNER_ID) if self.id else False
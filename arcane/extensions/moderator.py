@@ -1,5 +1,5 @@
 from arcane import bot
-from arcane.models import Channel
+from arcane.models import channel_repository
 from arcane.dataclasses import Message
 
 
@@ -29,9 +29,7 @@ async def cmd_settings(msg: Message, subcommand: str = None) -> None:
 @cmd_settings.subcommand(name='riotid', aliases=['id'], permissions=['moderator', 'broadcaster', 'owner'], cooldown=0)
 async def cmd_settings_riotid(msg: Message, name_with_tag: str) -> None:
     if '#' in name_with_tag:
-        channel = Channel.get(Channel.name == msg.channel.name)
-        channel.riot_id = name_with_tag
-        channel.save()
+        await channel_repository.update(msg.channel.name, riot_id=name_with_tag)
         await msg.reply('✅')
     else:
         await msg.reply('❌')
@@ -43,7 +41,23 @@ async def cmd_settings_otherplayer(msg: Message, argument: str = 'false') -> Non
     if argument not in ['true', 'false']:
         await msg.reply('❌')
     else:
-        channel = Channel.get(Channel.name == msg.channel.name)
-        channel.otherplayer = argument == 'true'
-        channel.save()
+        await channel_repository.update(msg.channel.name, otherplayer=argument == 'true')
         await msg.reply('✅')
+
+
+@cmd_settings.subcommand(name='prefix', permissions=['moderator', 'broadcaster', 'owner'], cooldown=0)
+async def cmd_settings_prefix(msg: Message, prefixes: str = None) -> None:
+    if not prefixes:
+        await msg.reply(f'Prefixes: {" ".join(bot.router.prefixes_for(msg.channel.name))}')
+        return
+
+    prefix_list = prefixes.split()
+    if prefix_list == ['reset']:
+        prefix_list = []
+    elif any(len(prefix) > 5 or prefix[0] in './' for prefix in prefix_list):
+        await msg.reply('❌')
+        return
+
+    await channel_repository.update(msg.channel.name, prefix=' '.join(prefix_list) or None)
+    bot.router.set_channel_prefixes(msg.channel.name, prefix_list)
+    await msg.reply('✅')
@@ -1,13 +1,13 @@
 from peewee import IntegrityError, DoesNotExist
 
 from arcane import bot
-from arcane.models import Channel
+from arcane.models import channel_repository
 from arcane.modules.api.twitch import api_latency, existing_channel_twitch
 
 
 @bot.command(name='channels', aliases=['ch'], permissions=['owner'], hidden=True)
 async def cmd_channels(msg, subcommands: str = None) -> None:
-    channels = Channel.get_all_channel_names()
+    channels = channel_repository.names()
     await msg.reply(f'Channels: {", ".join(channels)}')
 
 
@@ -18,11 +18,11 @@ async def cmd_add_channel(msg, channel_name: str) -> None:
 
     channel_name = channel_name.lower()
 
-    if not existing_channel_twitch(channel_name):
+    if not await existing_channel_twitch(channel_name):
         await msg.reply('There is no such user!')
         return
     try:
-        channel = Channel.create(name=channel_name)
+        await channel_repository.create(channel_name)
         await bot.join_channel(channel_name)
         await msg.reply(f'The user @{channel_name} added.')
     except IntegrityError:
@@ -37,9 +37,7 @@ async def cmd_del_channel(msg, channel_name: str) -> None:
     channel_name = channel_name.lower()
 
     try:
-        channel = Channel.get(Channel.name == channel_name)
-        channel.delete_instance()
-        channel.save()
+        await channel_repository.delete(channel_name)
         await bot.part_channel(channel_name)
         await msg.reply(f'The user @{channel_name} has been removed from the database.')
     except DoesNotExist:
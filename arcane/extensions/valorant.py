@@ -1,14 +1,19 @@
 from arcane import bot
-from arcane.models import Channel
-from arcane.modules.api.valorant import get_rank_with_rr_and_elo, get_stats_last_game, get_win_lose
+from arcane.models import channel_repository
+from arcane.modules.api.valorant import (get_rank_with_rr_and_elo, get_stats_last_game, get_win_lose, get_session_stats,
+                                         get_session_split)
+from arcane.modules.errors import APIError
 from arcane.dataclasses import Message
 
+# Groups listed by !session agents / !session maps, most played first, to stay within one chat message.
+SESSION_SPLIT_LIMIT = 5
+
 
 @bot.command(name='tracker', aliases=['profile'])
 async def cmd_valorant_tracker(msg: Message, valorant_name: str = None) -> None:
-    channel = Channel.get(Channel.name == msg.channel.name)
+    channel = channel_repository.get(msg.channel.name)
     if not valorant_name or '#' not in valorant_name or channel.riot_id:
-        valorant_name = channel.valorant
+        valorant_name = channel.riot_id
     if valorant_name:
         name, tag = valorant_name.split('#')
         name = name.replace(' ', '%20')
@@ -17,11 +22,14 @@ async def cmd_valorant_tracker(msg: Message, valorant_name: str = None) -> None:
 
 @bot.command(name='rank')
 async def cmd_valorant_rank(msg: Message, valorant_name: str = None) -> None:
-    channel = Channel.get(Channel.name == msg.channel.name)
+    channel = channel_repository.get(msg.channel.name)
     if not valorant_name or '#' not in valorant_name or channel.riot_id:
-        valorant_name = channel.valorant
+        valorant_name = channel.riot_id
     if valorant_name:
-        info = await get_rank_with_rr_and_elo(valorant_name)
+        try:
+            info = await get_rank_with_rr_and_elo(valorant_name)
+        except APIError:
+            info = None
         if info:
             await msg.reply(info)
         else:
@@ -30,11 +38,14 @@ async def cmd_valorant_rank(msg: Message, valorant_name: str = None) -> None:
 
 @bot.command(name='lastgame', aliases=['lg'])
 async def cmd_valorant_lg(msg: Message, valorant_name: str = None) -> None:
-    channel = Channel.get(Channel.name == msg.channel.name)
+    channel = channel_repository.get(msg.channel.name)
     if not valorant_name or '#' not in valorant_name or channel.riot_id:
-        valorant_name = channel.valorant
+        valorant_name = channel.riot_id
     if valorant_name:
-        info = await get_stats_last_game(valorant_name)
+        try:
+            info = await get_stats_last_game(valorant_name)
+        except APIError:
+            info = None
         if info:
             await msg.reply(f'{info["map_name"]} ({info["win_status"]}: {info["red_score"]}/{info["blue_score"]}) - '
                             f'{info["character"]} - {info["kills"]}/{info["deaths"]}/{info["assists"]} - '
@@ -45,13 +56,68 @@ async def cmd_valorant_lg(msg: Message, valorant_name: str = None) -> None:
 
 @bot.command(name='winlose', aliases=['wl'])
 async def cmd_valorant_winlose(msg: Message, valorant_name: str = None) -> None:
-    channel = Channel.get(Channel.name == msg.channel.name)
+    channel = channel_repository.get(msg.channel.name)
     if not valorant_name or '#' not in valorant_name or channel.riot_id:
-        valorant_name = channel.valorant
+        valorant_name = channel.riot_id
+    if not valorant_name:
+        return
 
-    win_count, lose_count = await get_win_lose(valorant_name)
+    try:
+        win_count, lose_count = await get_win_lose(valorant_name)
+    except APIError:
+        await msg.reply('❌')
+        return
     if win_count + lose_count != 0:
         win_rate = round((win_count / (win_count + lose_count)) * 100)
     else:
         win_rate = 0
     await msg.reply(f'W: {win_count} L: {lose_count} ({win_rate}%)')
+
+
+@bot.command(name='session', aliases=['today'])
+async def cmd_valorant_session(msg: Message, valorant_name: str = None) -> None:
+    channel = channel_repository.get(msg.channel.name)
+    if not valorant_name or '#' not in valorant_name or channel.riot_id:
+        valorant_name = channel.riot_id
+    if valorant_name:
+        try:
+            info = await get_session_stats(valorant_name)
+        except APIError:
+            info = None
+        if info and info['matches']:
+            await msg.reply(f'W: {info["wins"]} L: {info["losses"]} D: {info["draws"]} - '
+                            f'K/D/A: {info["kills"]}/{info["deaths"]}/{info["assists"]} - '
+                            f'KD: {info["kdr"]} HS%: {info["hs"]} ADR: {info["adr"]}')
+        elif info:
+            await msg.reply('No matches in the last 24 hours.')
+        else:
+            await msg.reply('❌')
+
+
+async def send_session_split(msg: Message, column: str, valorant_name: str = None) -> None:
+    channel = channel_repository.get(msg.channel.name)
+    if not valorant_name or '#' not in valorant_name or channel.riot_id:
+        valorant_name = channel.riot_id
+    if not valorant_name:
+        return
+
+    try:
+        split = await get_session_split(valorant_name, column)
+    except APIError:
+        await msg.reply('❌')
+        return
+    if not split:
+        await msg.reply('No matches in the last 24 hours.')
+        return
+    await msg.reply(' | '.join(f'{name}: {info["wins"]}W {info["losses"]}L - KD: {info["kdr"]} ADR: {info["adr"]}'
+                               for name, info in list(split.items())[:SESSION_SPLIT_LIMIT]))
+
+
+@cmd_valorant_session.subcommand(name='agents', aliases=['agent'])
+async def cmd_valorant_session_agents(msg: Message, valorant_name: str = None) -> None:
+    await send_session_split(msg, 'agent', valorant_name)
+
+
+@cmd_valorant_session.subcommand(name='maps', aliases=['map'])
+async def cmd_valorant_session_maps(msg: Message, valorant_name: str = None) -> None:
+    await send_session_split(msg, 'map', valorant_name)
@@ -1 +1,2 @@
 from .models import *
+from .repository import ChannelRepository, ChannelStore, channel_repository
@@ -1,6 +1,10 @@
+import json
+from datetime import datetime, timedelta
 from typing import List
 
-from peewee import SqliteDatabase, Model, CharField, PrimaryKeyField, BooleanField
+from peewee import (SqliteDatabase, Model, CharField, PrimaryKeyField, BooleanField, IntegerField, DateTimeField,
+                    FloatField, TextField)
+from playhouse.migrate import SqliteMigrator, migrate
 
 from arcane import settings
 
@@ -19,13 +23,117 @@ class BaseModel(Model):
 class Channel(BaseModel):
     riot_id = CharField(null=True)
     otherplayer = BooleanField(default=False)
+    prefix = CharField(null=True)
 
     class Meta:
         db_table = 'channels'
 
+    @property
+    def prefixes(self) -> list[str]:
+        """The channel's own command prefixes, stored space-separated."""
+        return self.prefix.split() if self.prefix else []
+
     @staticmethod
     def get_all_channel_names() -> List[str]:
         return [channel.name for channel in Channel.select()]
 
 
-db.create_tables([Channel])
+class RiotAccount(BaseModel):
+    puuid = CharField()
+    region = CharField()
+    account_level = IntegerField(null=True)
+    updated_at = DateTimeField(default=datetime.now)
+
+    expiry = timedelta(days=7)
+
+    class Meta:
+        db_table = 'riot_accounts'
+
+    @property
+    def expired(self) -> bool:
+        return datetime.now() - self.updated_at > self.expiry
+
+    @staticmethod
+    def lookup(name_with_tag: str) -> 'RiotAccount | None':
+        return RiotAccount.get_or_none(RiotAccount.name == name_with_tag.lower())
+
+    @staticmethod
+    def store(name_with_tag: str, puuid: str, region: str, account_level: int | None = None) -> None:
+        (RiotAccount
+         .insert(name=name_with_tag.lower(), puuid=puuid, region=region, account_level=account_level,
+                 updated_at=datetime.now())
+         .on_conflict(conflict_target=[RiotAccount.name],
+                      preserve=[RiotAccount.puuid, RiotAccount.region, RiotAccount.account_level,
+                                RiotAccount.updated_at])
+         .execute())
+
+
+class Match(Model):
+    puuid = CharField(index=True)
+    match_id = CharField()
+    mode = CharField()
+    started_at = FloatField()
+    data = TextField()
+
+    max_per_player = 100
+
+    class Meta:
+        database = db
+        db_table = 'matches'
+        indexes = ((('puuid', 'match_id'), True), (('puuid', 'mode', 'started_at'), False))
+
+    @staticmethod
+    def known_ids(puuid: str, mode: str) -> set[str]:
+        query = Match.select(Match.match_id).where((Match.puuid == puuid) & (Match.mode == mode))
+        return {match.match_id for match in query}
+
+    @staticmethod
+    def ingest(puuid: str, mode: str, matches: list[tuple[str, float, dict]]) -> int:
+        """Store ``(match_id, started_at, data)`` rows not stored yet and prune the oldest.
+
+        Returns the number of new matches.
+        """
+        known = Match.known_ids(puuid, mode)
+        rows = [{'puuid': puuid, 'match_id': match_id, 'mode': mode, 'started_at': started_at,
+                 'data': json.dumps(data, separators=(',', ':'))}
+                for match_id, started_at, data in matches if match_id not in known]
+        if not rows:
+            return 0
+
+        with db.atomic():
+            Match.insert_many(rows).on_conflict_ignore().execute()
+            oldest_kept = (Match
+                           .select(Match.started_at)
+                           .where((Match.puuid == puuid) & (Match.mode == mode))
+                           .order_by(Match.started_at.desc())
+                           .offset(Match.max_per_player - 1)
+                           .limit(1)
+                           .scalar())
+            if oldest_kept is not None:
+                Match.delete().where((Match.puuid == puuid) & (Match.mode == mode) &
+                                     (Match.started_at < oldest_kept)).execute()
+        return len(rows)
+
+    @staticmethod
+    def history(puuid: str, mode: str, limit: int | None = None) -> list[dict]:
+        """Stored match payloads, newest first."""
+        query = (Match
+                 .select(Match.data)
+                 .where((Match.puuid == puuid) & (Match.mode == mode))
+                 .order_by(Match.started_at.desc())
+                 .limit(limit or Match.max_per_player))
+        return [json.loads(match.data) for match in query]
+
+
+def migrate_columns(model: type[Model]) -> None:
+    """Add columns declared on ``model`` that an older database does not have yet."""
+    table = model._meta.table_name
+    existing = {column.name for column in db.get_columns(table)}
+    missing = [field for field in model._meta.sorted_fields if field.column_name not in existing]
+    if missing:
+        migrator = SqliteMigrator(db)
+        migrate(*(migrator.add_column(table, field.column_name, field) for field in missing))
+
+
+db.create_tables([Channel, RiotAccount, Match])
+migrate_columns(Channel)
@@ -0,0 +1,132 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+from peewee import DoesNotExist, IntegrityError
+
+from arcane.models.models import Channel
+
+
+class ChannelStore:
+    """Writes channel rows to the database.
+
+    In multi-process mode every worker shares the supervisor's instance through a
+    proxy, so writes from all workers go through one process.
+    """
+
+    def create(self, name: str, fields: dict) -> None:
+        Channel.create(name=name, **fields)
+
+    def update(self, name: str, fields: dict) -> None:
+        Channel.update(**fields).where(Channel.name == name).execute()
+
+    def delete(self, name: str) -> None:
+        Channel.delete().where(Channel.name == name).execute()
+
+
+class ChannelRepository:
+    """In-memory view of the channels table.
+
+    Reads never touch the database. Writes update the in-memory rows first and are
+    then persisted, in order, on a single database thread so the event loop never
+    blocks on SQLite. A write that fails to persist is undone in memory.
+
+    In multi-process mode a write to a channel this worker does not ``owns`` is
+    passed to ``forward`` instead of the store; the owning worker ``apply``s it to
+    its own rows and persists it.
+    """
+
+    def __init__(self) -> None:
+        self._channels: dict[str, Channel] = {}
+        self.store: ChannelStore = ChannelStore()
+        self.owns: Callable[[str], bool] = lambda name: True
+        self.forward: Callable[..., None] | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='arcane-db')
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._channels
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    def load(self) -> None:
+        self._channels = {channel.name: channel for channel in Channel.select()}
+
+    def get(self, name: str) -> Channel | None:
+        return self._channels.get(name)
+
+    def names(self) -> list[str]:
+        return list(self._channels)
+
+    async def _run(self, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def _write(self, operation: str, name: str, *args) -> None:
+        if self.forward is not None and not self.owns(name):
+            await self._run(self.forward, operation, name, *args)
+        else:
+            await self._run(getattr(self.store, operation), name, *args)
+
+    async def create(self, name: str, **fields) -> Channel:
+        if name in self._channels:
+            raise IntegrityError(f'Channel {name} already exists.')
+
+        channel = Channel(name=name, **fields)
+        self._channels[name] = channel
+        try:
+            await self._write('create', name, fields)
+        except Exception:
+            if self._channels.get(name) is channel:
+                del self._channels[name]
+            raise
+        return channel
+
+    async def update(self, name: str, **fields) -> Channel:
+        channel = self._channels.get(name)
+        if channel is None:
+            raise DoesNotExist(f'Channel {name} does not exist.')
+
+        previous = {field: getattr(channel, field) for field in fields}
+        for field, value in fields.items():
+            setattr(channel, field, value)
+        try:
+            await self._write('update', name, fields)
+        except Exception:
+            # Restore the fields no later write has changed since.
+            for field, value in fields.items():
+                if getattr(channel, field) == value:
+                    setattr(channel, field, previous[field])
+            raise
+        return channel
+
+    async def delete(self, name: str) -> None:
+        channel = self._channels.pop(name, None)
+        if channel is None:
+            raise DoesNotExist(f'Channel {name} does not exist.')
+
+        try:
+            await self._write('delete', name)
+        except Exception:
+            self._channels.setdefault(name, channel)
+            raise
+
+    async def apply(self, operation: str, name: str, *args) -> None:
+        """Apply a write forwarded by another worker to the in-memory rows and persist it.
+
+        Only the owner of ``name`` is sent its writes, so they go straight to the
+        store and are rolled back in memory if persisting fails.
+        """
+        if operation == 'create':
+            await self.create(name, **args[0])
+        elif operation == 'update':
+            await self.update(name, **args[0])
+        elif operation == 'delete':
+            await self.delete(name)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+channel_repository = ChannelRepository()
@@ -1,27 +1,65 @@
+import asyncio
+import random
 import time
 from datetime import datetime
+from typing import TYPE_CHECKING, Iterable
 
 import aiohttp
 import pytz
-import requests
 from dateutil.parser import parse as parse_datetime
 
 from arcane import settings
+from arcane.modules.cache import TTLCache
 from arcane.modules.errors import AuthenticationError, HTTPException
 
-session = aiohttp.ClientSession()
+if TYPE_CHECKING:
+    from arcane.modules.streams import StreamPoller
+
+helix_url = 'https://api.twitch.tv/helix'
+
+session: aiohttp.ClientSession | None = None
+timeout = aiohttp.ClientTimeout(total=10.0, connect=3.0)
 
 bot_headers = {
     'Client-ID': settings.CLIENT_ID,
     'Authorization': f'Bearer {settings.ACCESS_TOKEN}'
 }
 
+# https://dev.twitch.tv/docs/api/guide/#twitch-rate-limits
+ratelimit_remaining: int | None = None
+ratelimit_reset: float = 0.0
+
+HELIX_BATCH_SIZE = 100
+HELIX_RETRIES = 3
+
+# The running StreamPoller; stream lookups for the channels it tracks are answered from it.
+live_index: 'StreamPoller | None' = None
+
+USER_TTL = 60 * 60
+users = TTLCache(max_entries=1024)
+
+
+async def start_session() -> aiohttp.ClientSession:
+    global session
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit_per_host=20, ttl_dns_cache=300, keepalive_timeout=60.0)
+        session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+    return session
+
+
+async def close_session() -> None:
+    global session
+    if session is not None and not session.closed:
+        await session.close()
+    session = None
+
 
 async def get_token_info(token):
     url = 'https://id.twitch.tv/oauth2/validate'
     headers = {'Authorization': f'OAuth {token}'}
+    client = await start_session()
 
-    async with session.get(url=url, headers=headers) as resp:
+    async with client.get(url=url, headers=headers) as resp:
         if resp.status == 401:
             raise AuthenticationError('Invalid or unauthorized Access Token passed.')
         if resp.status > 300 or resp.status < 200:
@@ -30,33 +68,95 @@ async def get_token_info(token):
         return data
 
 
-def existing_channel_twitch(channel_name: str) -> bool:
-    url = f'https://api.twitch.tv/helix/users?login={channel_name}'
-    response = requests.get(url, headers=bot_headers)
-    if response.ok and response.json().get('data'):
-        return True
-    return False
+def _update_ratelimit(headers) -> None:
+    global ratelimit_remaining, ratelimit_reset
+    remaining = headers.get('Ratelimit-Remaining')
+    reset = headers.get('Ratelimit-Reset')
+    if remaining is not None:
+        ratelimit_remaining = int(remaining)
+    if reset is not None:
+        ratelimit_reset = float(reset)
+
+
+def _backoff(attempt: int) -> float:
+    return min(2 ** attempt, 8) * random.uniform(0.5, 1.5)
+
+
+async def helix_request(path: str, params: list[tuple[str, str]] | dict | None = None) -> dict | None:
+    """GET a Helix endpoint, retrying transient failures and waiting out the rate limit."""
+    client = await start_session()
+    url = f'{helix_url}/{path}'
+
+    for attempt in range(HELIX_RETRIES):
+        if ratelimit_remaining == 0 and ratelimit_reset > time.time():
+            await asyncio.sleep(ratelimit_reset - time.time())
+
+        try:
+            async with client.get(url, params=params, headers=bot_headers) as response:
+                _update_ratelimit(response.headers)
+                if response.status == 200:
+                    return await response.json()
+                if response.status != 429 and response.status < 500:
+                    return None
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+
+        if attempt < HELIX_RETRIES - 1:
+            await asyncio.sleep(_backoff(attempt))
+    return None
+
+
+async def helix_batched(path: str, key: str, values: Iterable[str],
+                        extra: list[tuple[str, str]] = ()) -> list[tuple[list[str], dict | None]]:
+    """Request ``path`` for ``values`` in batches of 100, returning each batch with its response."""
+    values = list(dict.fromkeys(values))
+    batches = [values[i:i + HELIX_BATCH_SIZE] for i in range(0, len(values), HELIX_BATCH_SIZE)]
+    responses = await asyncio.gather(*[
+        helix_request(path, [(key, value) for value in batch] + list(extra)) for batch in batches
+    ])
+    return list(zip(batches, responses))
+
+
+async def get_users(logins: Iterable[str]) -> list[dict]:
+    return [item for _, response in await helix_batched('users', 'login', logins) if response
+            for item in response['data']]
+
+
+async def get_streams(logins: Iterable[str]) -> list[dict]:
+    batches = await helix_batched('streams', 'user_login', logins, [('first', str(HELIX_BATCH_SIZE))])
+    return [item for _, response in batches if response for item in response['data']]
+
+
+async def existing_channel_twitch(channel_name: str) -> bool:
+    return bool(await get_users([channel_name]))
 
 
 async def get_stream(channel_name: str) -> list | None:
-    url = f'https://api.twitch.tv/helix/streams?user_login={channel_name}'
-    async with session.get(url, headers=bot_headers) as response:
-        if response.status == 200:
-            data = await response.json()
-            return data['data']
-        return
+    """The Helix streams of ``channel_name``, from the live index when the poller tracks it."""
+    state = live_index.get(channel_name) if live_index else None
+    if state is not None:
+        return [state.data] if state.live else []
+
+    data = await helix_request('streams', {'user_login': channel_name})
+    return data['data'] if data else None
 
 
-async def get_user(channel_name: str) -> dict | None:
-    url = f'https://api.twitch.tv/helix/users?login={channel_name}'
-    async with session.get(url, headers=bot_headers) as response:
-        if response.status == 200:
-            data = await response.json()
-            return data['data']
-        return
+async def _fetch_user(channel_name: str) -> tuple[list | None, int]:
+    data = await helix_request('users', {'login': channel_name})
+    return (data['data'] if data else None), 1
+
+
+async def get_user(channel_name: str) -> list | None:
+    """The Helix users of ``channel_name``, cached for ``USER_TTL`` seconds; failed lookups are not cached."""
+    return await users.get_or_fetch(
+        channel_name, lambda: _fetch_user(channel_name), USER_TTL, cacheable=lambda data: data is not None)
 
 
 async def get_stream_started_at(channel_name: str) -> datetime | None:
+    state = live_index.get(channel_name) if live_index else None
+    if state is not None:
+        return state.started_at
+
     data = await get_stream(channel_name)
     if data and len(data) > 0:
         started_at_str = data[0]['started_at']
@@ -65,9 +165,10 @@ async def get_stream_started_at(channel_name: str) -> datetime | None:
 
 
 async def api_latency() -> int | None:
+    client = await start_session()
     start_time = time.time()
 
-    async with session.get('https://gql.twitch.tv/gql', timeout=5):
+    async with client.get('https://gql.twitch.tv/gql', timeout=5):
         end_time = time.time()
         latency = round((end_time - start_time) * 1000)
         return latency
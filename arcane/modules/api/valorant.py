@@ -1,165 +1,410 @@
-from datetime import datetime, timedelta
-from typing import Tuple, Dict, Any
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
 
 import aiohttp
 
+from arcane.models import Match, RiotAccount
+from arcane.modules.cache import TTLCache
+from arcane.modules.errors import (APIError, APITimeoutError, CircuitOpenError, NotFoundError, RateLimitedError,
+                                   ThrottledError, UpstreamUnavailableError)
+from arcane.modules.ratelimit import RequestScheduler
+from arcane.modules.resilience import CircuitBreaker, LatencyTracker, backoff
+from arcane.modules.stats import MatchTable
+from arcane.settings import VALORANT_DEADLINE, VALORANT_HEDGE, VALORANT_RATE_LIMIT
+
 api_url = 'https://api.henrikdev.xyz'
 
+session: aiohttp.ClientSession | None = None
+timeout = aiohttp.ClientTimeout(total=10.0, connect=3.0)
+
+_inflight: dict[str, asyncio.Future] = {}
+# Most urgent priority among the callers waiting on each in-flight request.
+_priorities: dict[str, int] = {}
+
+# Attempts per request, all within one VALORANT_DEADLINE budget.
+REQUEST_ATTEMPTS = 3
+breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30.0)
+latency = LatencyTracker(window=200)
+hedges = 0
+
+# Upstream quota per minute, corrected by the rate-limit headers of each response.
+scheduler = RequestScheduler(limit=VALORANT_RATE_LIMIT, per=60.0)
+# Priority class of the requests made in the current task, read by fetch_data when it is called.
+request_priority: ContextVar[int] = ContextVar('request_priority', default=RequestScheduler.INTERACTIVE)
+
+# Matches requested when the store already has a player's history, and when it does not.
+MATCH_DELTA_SIZE = 3
+MATCH_HISTORY_SIZE = 30
+
+MAX_TABLES = 256
+_tables: OrderedDict[tuple[str, str], MatchTable] = OrderedDict()
+
+cache = TTLCache(max_entries=2048, max_bytes=32 * 1024 * 1024)
+
+# endpoint: (ttl, stale_ttl) in seconds
+cache_ttls = {
+    'account': (6 * 60 * 60, 24 * 60 * 60),
+    'mmr': (60.0, 5 * 60.0),
+    'matches': (60.0, 5 * 60.0),
+}
+
+
+async def start_session() -> aiohttp.ClientSession:
+    global session
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=100, limit_per_host=20, ttl_dns_cache=300, keepalive_timeout=60.0)
+        session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+    return session
+
+
+async def close_session() -> None:
+    global session
+    await scheduler.close()
+    if session is not None and not session.closed:
+        await session.close()
+    session = None
+
+
+def _endpoint(url: str) -> str | None:
+    path = url[len(api_url):].split('?', 1)[0]
+    for endpoint in cache_ttls:
+        if f'/{endpoint}/' in path:
+            return endpoint
+    return None
+
+
+async def fetch_data(url: str, refresh: bool = False) -> dict:
+    """Fetch a URL through the response cache, falling back to a coalesced upstream request.
+
+    With ``refresh`` the cache is bypassed and the new response replaces the
+    cached one. When the upstream fails, the circuit is open or the rate limit
+    leaves no room, the last cached response is served however old it is; without
+    one the ``APIError`` is raised.
+
+    Requests run at the caller's ``request_priority``. Refreshing a stale entry in
+    the background, after the caller was answered from it, is ``BACKGROUND`` work.
+    """
+    priority = request_priority.get()
+    # A caller that joins a request already in flight, here or inside the cache, raises it to its priority.
+    _promote(url, priority)
+    endpoint = _endpoint(url)
+    if endpoint is None:
+        data, _ = await _fetch(url, priority)
+        return data
 
-async def fetch_data(url: str) -> dict | str:
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
+    ttl, stale_ttl = cache_ttls[endpoint]
+    try:
+        if refresh:
+            data, size = await _fetch(url, priority)
+            cache.set(url, data, ttl, size, stale_ttl)
+            return data
+        return await cache.get_or_fetch(url, lambda: _fetch(url, priority), ttl, stale_ttl,
+                                        refresh=lambda: _fetch(url, RequestScheduler.BACKGROUND))
+    except APIError as e:
+        entry = cache.peek(url)
+        if entry is None or isinstance(e, NotFoundError):
+            raise
+        return entry.value
+
+
+async def _fetch(url: str, priority: int = RequestScheduler.INTERACTIVE) -> tuple[dict, int]:
+    """Share one upstream request between concurrent callers of the same URL.
+
+    A caller more urgent than the request it joins raises the request to its priority.
+    """
+    future = _inflight.get(url)
+    if future is None:
+        _priorities[url] = priority
+        future = asyncio.ensure_future(_request(url))
+        _inflight[url] = future
+        future.add_done_callback(lambda _: (_inflight.pop(url, None), _priorities.pop(url, None)))
+    else:
+        _promote(url, priority)
+    return await asyncio.shield(future)
+
+
+def _promote(url: str, priority: int) -> None:
+    if url in _inflight and priority < _priorities[url]:
+        _priorities[url] = priority
+        scheduler.promote(url, priority)
+
+
+async def _request(url: str) -> tuple[dict, int]:
+    """GET ``url`` within ``VALORANT_DEADLINE`` seconds, retrying transient failures with jitter.
+
+    Every attempt the circuit allows then waits for a slot from the scheduler, at
+    the priority of its most urgent caller; one that gets none before the deadline
+    raises ``ThrottledError`` instead of risking a 429.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + VALORANT_DEADLINE
+
+    for attempt in range(REQUEST_ATTEMPTS):
+        if not breaker.allow():
+            raise CircuitOpenError('Valorant API circuit is open', reason=f'retry in {breaker.retry_after:.0f}s')
+        priority = _priorities.get(url, RequestScheduler.INTERACTIVE)
+        if not await scheduler.acquire(priority, deadline - loop.time(), key=url):
+            breaker.release()
+            raise ThrottledError('Valorant API', status=429, reason='local rate limit')
+
+        try:
+            async with asyncio.timeout_at(deadline):
+                result = await (_hedged(url, priority) if VALORANT_HEDGE else _attempt(url))
+        except TimeoutError:
+            error = APITimeoutError('Valorant API request timed out', status=408, reason='Request Timeout')
+        except APIError as e:
+            error = e
+        else:
+            breaker.record_success()
+            return result
+
+        if not error.transient:
+            # The upstream answered; a 404 says nothing about its health.
+            breaker.record_success()
+            raise error
+
+        breaker.record_failure()
+        delay = backoff(attempt)
+        if isinstance(error, RateLimitedError) and error.retry_after:
+            delay = max(delay, error.retry_after)
+        if attempt == REQUEST_ATTEMPTS - 1 or loop.time() + delay >= deadline:
+            raise error
+        await asyncio.sleep(delay)
+
+
+async def _attempt(url: str) -> tuple[dict, int]:
+    client = await start_session()
+    started = time.monotonic()
+    try:
+        async with client.get(url) as response:
+            _observe_rate_limit(response)
             if response.status == 200:
-                return await response.json()
-            else:
-                return f'{response.status} - {response.reason}'
+                body = await response.read()
+                latency.record(time.monotonic() - started)
+                return json.loads(body), len(body)
+            if response.status == 404:
+                raise NotFoundError('Valorant API', status=404, reason=response.reason)
+            if response.status == 429:
+                retry_after = response.headers.get('Retry-After')
+                raise RateLimitedError('Valorant API', status=429, reason=response.reason,
+                                       retry_after=float(retry_after) if retry_after else None)
+            if response.status >= 500:
+                raise UpstreamUnavailableError('Valorant API', status=response.status, reason=response.reason)
+            raise APIError('Valorant API', status=response.status, reason=response.reason)
+    except aiohttp.ClientError as e:
+        raise UpstreamUnavailableError('Valorant API', status=503, reason=str(e)) from e
+
+
+def _observe_rate_limit(response: aiohttp.ClientResponse) -> None:
+    """Hand the quota reported in the ``x-ratelimit-*`` headers, or a 429's ``Retry-After``, to the scheduler."""
+    headers = response.headers
+    try:
+        if 'x-ratelimit-remaining' in headers:
+            limit = headers.get('x-ratelimit-limit')
+            scheduler.update(int(limit) if limit else None, int(headers['x-ratelimit-remaining']),
+                             float(headers.get('x-ratelimit-reset', 60)))
+        elif response.status == 429:
+            scheduler.update(None, 0, float(headers.get('Retry-After', 60)))
+    except ValueError:
+        pass
+
+
+async def _hedged(url: str, priority: int) -> tuple[dict, int]:
+    """Send a second copy of the request once the first outlives the p95 latency; first success wins.
+
+    The copy is only sent when the scheduler has a slot free right away.
+    """
+    global hedges
+    tasks = {asyncio.ensure_future(_attempt(url))}
+    try:
+        p95 = latency.percentile(0.95)
+        if p95 is not None:
+            done, _ = await asyncio.wait(tasks, timeout=p95)
+            if not done and scheduler.try_acquire(priority):
+                hedges += 1
+                tasks.add(asyncio.ensure_future(_attempt(url)))
+
+        error = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _account_url(name_with_tag: str) -> str:
+    name, tag = name_with_tag.split('#')
+    return f'{api_url}/valorant/v1/account/{name}/{tag}'
 
 
-async def get_account_details(name_with_tag: str) -> dict | str:
-    name, tag = name_with_tag.split('#')
-    url = f'{api_url}/valorant/v1/account/{name}/{tag}'
-    return await fetch_data(url)
+async def get_account_details(name_with_tag: str) -> dict:
+    return await fetch_data(_account_url(name_with_tag))
+
+
+async def resolve_account(name_with_tag: str) -> tuple[str, str]:
+    """Resolve a Riot ID to its ``(region, puuid)`` with a single account request.
+
+    Resolved accounts are persisted in the database, so after a restart they are
+    loaded from disk instead of the API until they expire. An expired row is still
+    used when the API fails.
+    """
+    url = _account_url(name_with_tag)
+    if url in cache:
+        data = await get_account_details(name_with_tag)
+        return data['data']['region'], data['data']['puuid']
+
+    stored = await asyncio.to_thread(RiotAccount.lookup, name_with_tag)
+    if stored and not stored.expired:
+        payload = {'data': {'puuid': stored.puuid, 'region': stored.region, 'account_level': stored.account_level}}
+        ttl, stale_ttl = cache_ttls['account']
+        cache.set(url, payload, ttl, len(json.dumps(payload)), stale_ttl)
+        return stored.region, stored.puuid
+
+    try:
+        data = await get_account_details(name_with_tag)
+    except APIError as e:
+        if stored and not isinstance(e, NotFoundError):
+            return stored.region, stored.puuid
+        raise
+
+    account = data['data']
+    await asyncio.to_thread(
+        RiotAccount.store, name_with_tag, account['puuid'], account['region'], account.get('account_level'))
+    return account['region'], account['puuid']
 
 
 async def get_puuid(name_with_tag: str) -> str:
     data = await get_account_details(name_with_tag)
-    return data['data']['puuid'] if isinstance(data, dict) else data
+    return data['data']['puuid']
 
 
 async def get_region(name_with_tag: str) -> str:
     data = await get_account_details(name_with_tag)
-    return data['data']['region'] if isinstance(data, dict) else data
+    return data['data']['region']
 
 
-async def get_account_level(name_with_tag: str) -> str:
+async def get_account_level(name_with_tag: str) -> int:
     data = await get_account_details(name_with_tag)
-    return data['data']['accountLevel'] if isinstance(data, dict) else data
+    return data['data']['account_level']
 
 
-async def get_mmr_details(name_with_tag: str) -> dict | str:
-    affinity = await get_region(name_with_tag)
-    puuid = await get_puuid(name_with_tag)
+async def get_mmr_details(name_with_tag: str, refresh: bool = False) -> dict:
+    affinity, puuid = await resolve_account(name_with_tag)
     url = f'{api_url}/valorant/v1/by-puuid/mmr/{affinity}/{puuid}'
-    return await fetch_data(url)
+    return await fetch_data(url, refresh)
 
 
 async def get_rank_with_rr_and_elo(name_with_tag: str) -> str:
-    name, tag = name_with_tag.split('#')
-    data = await get_mmr_details(name_with_tag)
-    if isinstance(data, dict):
-        rank = data['data']['currenttierpatched']
-        rr = data['data']['ranking_in_tier']
-        elo = data['data']['elo']
+    data = (await get_mmr_details(name_with_tag))['data']
+    rank = data['currenttierpatched']
+    rr = data['ranking_in_tier']
+    elo = data['elo']
+    return f'{rank} - {rr}RR - {elo} elo'
 
-        mmr_change = data['data']['mmr_change_to_last_game']
-        if mmr_change > 0:
-            mmr_change = '+' + str(mmr_change)
 
-        return f'{rank} - {rr}RR - {elo} elo'
-    else:
-        return data
+async def get_matches(name_with_tag: str, mode: str = 'competitive', size: int = None) -> dict:
+    region, puuid = await resolve_account(name_with_tag)
+    return await fetch_data(_matches_url(region, puuid, mode, size or MATCH_HISTORY_SIZE))
 
 
-async def get_matches(name_with_tag: str, mode: str = 'competitive', size: int = None) -> dict | str:
-    puuid = await get_puuid(name_with_tag)
-    region = await get_region(name_with_tag)
-    if size:
-        url = f'{api_url}/valorant/v1/by-puuid/lifetime/matches/{region}/{puuid}?mode={mode}&size={size}'
-    else:
-        url = f'{api_url}/valorant/v1/by-puuid/lifetime/matches/{region}/{puuid}?mode={mode}&size=30'
-    return await fetch_data(url)
+def _matches_url(region: str, puuid: str, mode: str, size: int) -> str:
+    return f'{api_url}/valorant/v1/by-puuid/lifetime/matches/{region}/{puuid}?mode={mode}&size={size}'
 
 
-async def get_stats_last_game(name_with_tag: str) -> dict[str | int, str | int]:
-    data = await get_matches(name_with_tag, size=1)
-    game_data = data['data'][0]
+async def _load_table(puuid: str, mode: str) -> MatchTable:
+    table = MatchTable.from_matches(await asyncio.to_thread(Match.history, puuid, mode))
+    _tables[puuid, mode] = table
+    _tables.move_to_end((puuid, mode))
+    if len(_tables) > MAX_TABLES:
+        _tables.popitem(last=False)
+    return table
 
-    stats = game_data['stats']
-    teams = game_data['teams']
-    meta = game_data['meta']
-    map_name = meta['map']['name']
-    match_id = meta['id']
-    team = stats['team']
 
-    character = stats['character']['name']
-    kills = stats['kills']
-    deaths = stats['deaths']
-    assists = stats['assists']
-    kill_death_ratio = str(round(int(kills) / int(deaths), 1))
+async def get_match_table(name_with_tag: str, mode: str = 'competitive', refresh: bool = False) -> MatchTable:
+    """The player's stored match history as a ``MatchTable``, synced with the API first.
 
-    shots = stats['shots']
-    head_shots = shots.get('head', 0)
-    body_shots = shots.get('body', 0)
-    leg_shots = shots.get('leg', 0)
+    Only the newest ``MATCH_DELTA_SIZE`` matches are requested once the player has
+    stored matches. The full ``MATCH_HISTORY_SIZE`` is requested for a new player,
+    or when every match in the small page is new and some may have been missed.
+    If the API fails, the stored history is returned as long as there is one.
+    """
+    region, puuid = await resolve_account(name_with_tag)
 
-    damage_made = stats['damage']['made']
+    table = _tables.get((puuid, mode))
+    if table is None:
+        table = await _load_table(puuid, mode)
+    else:
+        _tables.move_to_end((puuid, mode))
+    known = set(table.match_ids)
 
-    total_shots = head_shots + body_shots + leg_shots
+    size = MATCH_DELTA_SIZE if known else MATCH_HISTORY_SIZE
+    try:
+        data = await fetch_data(_matches_url(region, puuid, mode, size), refresh)
+    except APIError:
+        if known:
+            return table
+        raise
 
-    head_shot_percentage = round((head_shots / total_shots) * 100) if total_shots > 0 else 0
+    fresh = [match for match in data['data'] if match['meta']['id'] not in known]
+    if fresh and len(fresh) == len(data['data']) and size < MATCH_HISTORY_SIZE:
+        try:
+            backfill = await fetch_data(_matches_url(region, puuid, mode, MATCH_HISTORY_SIZE))
+            fresh = [match for match in backfill['data'] if match['meta']['id'] not in known]
+        except APIError:
+            pass
 
-    red_score = teams['red']
-    blue_score = teams['blue']
-    total_round = red_score + blue_score
+    if fresh:
+        await asyncio.to_thread(Match.ingest, puuid, mode, [MatchTable.compact(match) for match in fresh])
+        table = await _load_table(puuid, mode)
+    return table
 
-    if red_score > blue_score:
-        win = 'Red'
-    elif red_score < blue_score:
-        win = 'Blue'
-    else:
-        win = 'Drew'
-
-    win_status = 'W' if team == win else 'D' if win == 'Drew' else 'L'
-    average_damage_per_round = str(round(int(damage_made) / int(total_round), 1))
-
-    return {
-            'match_id': match_id,
-            'map_name': map_name,
-            'win_status': win_status,
-            'red_score': red_score,
-            'blue_score': blue_score,
-            'character': character,
-            'kills': kills,
-            'deaths': deaths,
-            'assists': assists,
-            'kdr': kill_death_ratio,
-            'hs': head_shot_percentage,
-            'adr': average_damage_per_round
-        }
-
-
-def is_last_24_hours(date_str):
-    current_datetime = datetime.now()
-    last_24_hours = current_datetime - timedelta(hours=24)
-    date_obj = datetime.strptime(date_str, '%Y-%m-%dT%H:%M:%S.%fZ')
-    return date_obj >= last_24_hours
 
+async def get_stats_last_game(name_with_tag: str) -> dict[str | int, str | int] | None:
+    table = await get_match_table(name_with_tag)
+    return table.last_game()
 
-async def get_win_lose(name_with_tag: str) -> tuple[int, int]:
-    data = await get_matches(name_with_tag)
-    filtered_data = [item for item in data['data'] if is_last_24_hours(item['meta']['started_at'])]
-    win_count = 0
-    lose_count = 0
-    drew_count = 0
-
-    for item in filtered_data:
-        teams = item['teams']
-        red_score = teams['red']
-        blue_score = teams['blue']
-        team = item['stats']['team']
-
-        if red_score > blue_score:
-            win = 'Red'
-        elif red_score < blue_score:
-            win = 'Blue'
-        else:
-            win = 'Drew'
 
-        if team == win:
-            win_count += 1
-        elif win == 'Drew':
-            drew_count += 1
-        else:
-            lose_count += 1
+async def get_session_stats(name_with_tag: str, hours: float = 24) -> dict:
+    table = await get_match_table(name_with_tag)
+    return table.summary(table.last_hours(hours))
+
 
-    return win_count, lose_count
+async def get_session_split(name_with_tag: str, column: str, hours: float = 24) -> dict[str, dict]:
+    """Session stats per agent (``column='agent'``) or per map (``column='map'``)."""
+    table = await get_match_table(name_with_tag)
+    return table.split(column, table.last_hours(hours))
+
+
+async def get_win_lose(name_with_tag: str) -> tuple[int, int]:
+    table = await get_match_table(name_with_tag)
+    wins, losses, _ = table.record(table.last_hours(24))
+    return wins, losses
+
+
+async def warm(name_with_tag: str) -> str | None:
+    """Refresh the MMR and match history of a player ahead of commands.
+
+    Its requests are scheduled behind those of commands. Returns the id of the
+    newest stored match. Raises the match history's ``APIError``; an MMR failure
+    alone is ignored.
+    """
+    token = request_priority.set(RequestScheduler.BACKGROUND)
+    try:
+        _, table = await asyncio.gather(
+            get_mmr_details(name_with_tag, refresh=True),
+            get_match_table(name_with_tag, refresh=True),
+            return_exceptions=True,
+        )
+    finally:
+        request_priority.reset(token)
+    if isinstance(table, BaseException):
+        raise table
+    return table.match_ids[-1] if table.match_ids else None
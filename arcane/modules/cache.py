@@ -0,0 +1,157 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class CacheEntry:
+    __slots__ = ('value', 'size', 'expires_at', 'stale_until')
+
+    def __init__(self, value: Any, size: int, ttl: float, stale_ttl: float) -> None:
+        now = time.monotonic()
+        self.value = value
+        self.size = size
+        self.expires_at = now + ttl
+        self.stale_until = self.expires_at + stale_ttl
+
+    def __repr__(self):
+        return f'<CacheEntry size: {self.size}, fresh: {self.fresh}>'
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    @property
+    def usable(self) -> bool:
+        return time.monotonic() < self.stale_until
+
+
+class TTLCache:
+    """LRU cache bounded by entry count and total byte size, with per-entry TTLs.
+
+    Entries past their TTL but still inside their stale window are served as-is by
+    ``get_or_fetch`` while a single background refresh replaces them. Concurrent
+    misses on the same key share one fetch.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._refreshing: dict[Hashable, asyncio.Task] = {}
+        self._loading: dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry.usable
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'bytes': self.size,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def peek(self, key: Hashable) -> CacheEntry | None:
+        """Return the entry for ``key`` without touching counters or LRU order."""
+        return self._entries.get(key)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or not entry.fresh:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: float, size: int = 1, stale_ttl: float = 0.0) -> None:
+        if size > self.max_bytes:
+            return
+
+        self.pop(key)
+        self._entries[key] = CacheEntry(value, size, ttl, stale_ttl)
+        self.size += size
+
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> Any:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self.size -= entry.size
+        return entry.value
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[tuple[Any, int]]],
+        ttl: float,
+        stale_ttl: float = 0.0,
+        cacheable: Callable[[Any], bool] = lambda value: True,
+        refresh: Callable[[], Awaitable[tuple[Any, int]]] | None = None,
+    ) -> Any:
+        """Return the cached value for ``key`` or fetch it.
+
+        ``fetch`` returns ``(value, size)`` and is called once for all callers that
+        miss on ``key`` while it runs. Values rejected by ``cacheable`` are
+        returned to those callers but not stored. The background refresh of a stale
+        entry calls ``refresh`` instead of ``fetch`` when it is given.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.fresh:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry.value
+            if entry.usable:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                if key not in self._refreshing:
+                    task = asyncio.create_task(self._refresh(key, refresh or fetch, ttl, stale_ttl, cacheable))
+                    self._refreshing[key] = task
+                return entry.value
+
+        self.misses += 1
+        future = self._loading.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._load(key, fetch, ttl, stale_ttl, cacheable))
+            self._loading[key] = future
+            future.add_done_callback(lambda _: self._loading.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _load(self, key, fetch, ttl, stale_ttl, cacheable) -> Any:
+        value, size = await fetch()
+        if cacheable(value):
+            self.set(key, value, ttl, size, stale_ttl)
+        return value
+
+    async def _refresh(self, key, fetch, ttl, stale_ttl, cacheable) -> None:
+        try:
+            value, size = await fetch()
+        except Exception:
+            # keep serving the stale entry until it runs out
+            return
+        finally:
+            self._refreshing.pop(key, None)
+
+        if cacheable(value):
+            self.set(key, value, ttl, size, stale_ttl)
@@ -1,13 +1,22 @@
+import asyncio
+
 from arcane import bot
 from arcane.models import Channel
 from arcane.modules import printt
-from arcane.modules.api.twitch import existing_channel_twitch
+from arcane.modules.api.twitch import existing_channel_twitch, close_session
+
+
+async def _existing_channel(channel_name: str) -> bool:
+    try:
+        return await existing_channel_twitch(channel_name)
+    finally:
+        await close_session()
 
 
 def add_channel() -> None:
     channel_name = str(printt.input_answer('Which channel do you want to add?'))
 
-    if not existing_channel_twitch(channel_name):
+    if not asyncio.run(_existing_channel(channel_name)):
         printt.error('There is no such user!')
         return
 
@@ -33,5 +42,9 @@ def remove_channel() -> None:
         printt.error(f'User @{channel_name} is not in the database.')
 
 
-def run_bot() -> None:
-    bot.run()
+def run_bot(workers: int = 1) -> None:
+    if workers > 1:
+        from arcane.modules.supervisor import supervise
+        supervise(workers)
+    else:
+        bot.run()
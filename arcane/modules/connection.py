@@ -0,0 +1,278 @@
+import asyncio
+import bisect
+import logging
+import math
+import random
+import time
+import zlib
+from typing import TYPE_CHECKING
+
+import aiohttp
+
+from arcane.modules import log
+from arcane.modules.parser import parse_line
+from arcane.modules.ratelimit import BucketRegistry, SharedTokenBucket, TokenBucket
+
+if TYPE_CHECKING:
+    from arcane import Arcane
+
+# https://dev.twitch.tv/docs/irc/#rate-limits
+JOIN_LIMIT = (20, 10.0)
+VIRTUAL_NODES = 64
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+
+class Connection:
+    """A single authenticated IRC websocket and the channels joined on it.
+
+    When the socket drops, or the server asks for a RECONNECT, the connection is
+    reopened with jittered exponential backoff, re-authenticated, and its channels
+    are re-joined through the pool's JOIN limiter. ``send`` waits while the
+    connection is down; the outbound scheduler checks ``ConnectionPool.connected``
+    first and holds the channel's messages until it is back.
+    """
+
+    def __init__(self, pool: 'ConnectionPool', shard_id: int) -> None:
+        self._pool = pool
+        self._bot = pool._bot
+        self.shard_id = shard_id
+        self.channels: set[str] = set()
+        self.reconnects = 0
+        self.last_reconnect: float | None = None
+        self._session: aiohttp.ClientSession | None = None
+        self._websocket: aiohttp.ClientWebSocketResponse | None = None
+        self._connected = asyncio.Event()
+        self._closing = False
+        self._task: asyncio.Task | None = None
+        self._rejoin_task: asyncio.Task | None = None
+
+    def __repr__(self):
+        return f'<Connection shard: {self.shard_id}, channels: {len(self.channels)}>'
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    async def connect(self) -> None:
+        await self._open()
+        self._task = asyncio.create_task(self._run())
+
+    async def _open(self) -> None:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        self._websocket = await self._session.ws_connect(url=self._bot._host, heartbeat=30.0)
+
+        await self._websocket.send_str(f'PASS oauth:{self._bot._token}\r\n')
+        await self._websocket.send_str(f'NICK {self._bot.username}\r\n')
+        for cap in ('tags', 'commands', 'membership'):
+            await self._websocket.send_str(f'CAP REQ :twitch.tv/{cap}\r\n')
+        self._connected.set()
+
+    async def send(self, command: str) -> None:
+        await self._connected.wait()
+        await self._websocket.send_str(command + '\r\n')
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await self._read_loop()
+            except (aiohttp.ClientError, ConnectionError) as e:
+                log.irc.warning('Shard %s lost its connection: %s', self.shard_id, e)
+            if not self._closing:
+                await self._reconnect()
+
+    async def _read_loop(self) -> None:
+        while True:
+            received_msg = await self._websocket.receive()
+            if received_msg.type == aiohttp.WSMsgType.TEXT:
+                for message in received_msg.data.split('\r\n'):
+                    if not message:
+                        continue
+
+                    if log.irc.isEnabledFor(logging.DEBUG):
+                        log.irc.debug(message, extra={'shard': self.shard_id})
+
+                    line = parse_line(message)
+                    if line.action == 'PING':
+                        await self._websocket.send_str('PONG :tmi.twitch.tv\r\n')
+                    elif line.action == 'RECONNECT':
+                        return
+                    else:
+                        await self._bot.receive(line)
+            elif received_msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED,
+                                       aiohttp.WSMsgType.ERROR):
+                return
+
+    async def _reconnect(self) -> None:
+        self._connected.clear()
+        started = time.monotonic()
+        if self._websocket and not self._websocket.closed:
+            await self._websocket.close()
+
+        attempt = 0
+        while True:
+            try:
+                await self._open()
+                break
+            except (aiohttp.ClientError, OSError, asyncio.TimeoutError) as e:
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+                attempt += 1
+                log.irc.warning('Shard %s reconnect attempt %s failed: %s. Retrying in %.1fs.',
+                                self.shard_id, attempt, e, delay)
+                await asyncio.sleep(delay)
+
+        if self._rejoin_task:
+            self._rejoin_task.cancel()
+        self._rejoin_task = asyncio.create_task(self._rejoin(started))
+
+    async def _rejoin(self, started: float) -> None:
+        for channel in list(self.channels):
+            await self._pool._join_bucket.acquire()
+            await self.send(f'JOIN #{channel}')
+
+        self.reconnects += 1
+        self.last_reconnect = time.monotonic() - started
+        log.irc.info('Shard %s reconnected and rejoined %s channel(s) in %.2fs.',
+                     self.shard_id, len(self.channels), self.last_reconnect,
+                     extra={'shard': self.shard_id, 'reconnect_seconds': self.last_reconnect})
+
+    async def close(self) -> None:
+        self._closing = True
+        for task in (self._task, self._rejoin_task):
+            if task:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._connected.clear()
+        if self._websocket:
+            await self._websocket.close()
+        if self._session:
+            await self._session.close()
+
+
+class ConnectionPool:
+    """Spreads channels over several IRC connections.
+
+    A channel goes to its shard on a consistent-hash ring, or to the least loaded
+    shard when that one already holds ``channels_per_shard`` channels. A new
+    connection is opened only when every shard is full, and surplus connections are
+    closed once their last channel is parted, so joins and parts never move other
+    channels. Every inbound line is handed to the same ``Arcane.receive`` dispatcher,
+    and all JOINs share one rate limiter.
+    """
+
+    def __init__(self, bot: 'Arcane', shards: int, channels_per_shard: int) -> None:
+        self._bot = bot
+        self.shards = max(shards, 1)
+        self.channels_per_shard = channels_per_shard
+        self._connections: dict[int, Connection] = {}
+        self._next_shard_id = 0
+        self._ring: list[tuple[int, int]] = []
+        self._owners: dict[str, Connection] = {}
+        self._join_bucket: TokenBucket | SharedTokenBucket = TokenBucket(*JOIN_LIMIT)
+        self._join_task: asyncio.Task | None = None
+        self._closed = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    @property
+    def connections(self) -> list[Connection]:
+        return list(self._connections.values())
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return zlib.crc32(key.encode())
+
+    def _add_shard(self) -> Connection:
+        connection = Connection(self, self._next_shard_id)
+        self._next_shard_id += 1
+        self._connections[connection.shard_id] = connection
+        for replica in range(VIRTUAL_NODES):
+            bisect.insort(self._ring, (self._hash(f'{connection.shard_id}:{replica}'), connection.shard_id))
+        return connection
+
+    async def _remove_shard(self, connection: Connection) -> None:
+        del self._connections[connection.shard_id]
+        self._ring = [node for node in self._ring if node[1] != connection.shard_id]
+        await connection.close()
+
+    def share_limits(self, buckets: BucketRegistry) -> None:
+        """Draw JOINs from ``buckets``, shared with the other workers logged in as the same account."""
+        self._join_bucket = SharedTokenBucket(buckets, 'join', *JOIN_LIMIT)
+
+    def shard_for(self, channel: str) -> Connection:
+        index = bisect.bisect(self._ring, (self._hash(channel), self._next_shard_id))
+        return self._connections[self._ring[index % len(self._ring)][1]]
+
+    def owner(self, channel: str) -> Connection | None:
+        return self._owners.get(channel)
+
+    async def start(self, channels: list[str]) -> None:
+        """Open the connections and return; the channels are joined in the background.
+
+        At the JOIN rate limit a large channel list takes a minute or more to join,
+        so ``start`` does not wait for it.
+        """
+        shards = max(self.shards, math.ceil(len(channels) / self.channels_per_shard))
+        for _ in range(shards):
+            self._add_shard()
+        await asyncio.gather(*(connection.connect() for connection in self._connections.values()))
+        self._join_task = asyncio.create_task(self._join_all(channels))
+
+    async def _join_all(self, channels: list[str]) -> None:
+        for channel in channels:
+            try:
+                await self.join(channel)
+            except (aiohttp.ClientError, ConnectionError) as e:
+                log.irc.warning('Could not join #%s: %s', channel, e)
+        log.irc.info('Joined %s channel(s) on %s connection(s).', len(self._owners), len(self._connections))
+
+    async def join(self, channel: str) -> None:
+        if channel in self._owners:
+            return
+
+        connection = self.shard_for(channel)
+        if len(connection.channels) >= self.channels_per_shard:
+            connection = min(self._connections.values(), key=lambda c: len(c.channels))
+        if len(connection.channels) >= self.channels_per_shard:
+            connection = self._add_shard()
+            await connection.connect()
+
+        # Claimed before waiting on the limiter so a concurrent join of the same channel is a no-op.
+        connection.channels.add(channel)
+        self._owners[channel] = connection
+        await self._join_bucket.acquire()
+        if self._owners.get(channel) is connection:
+            await connection.send(f'JOIN #{channel}')
+
+    async def part(self, channel: str) -> None:
+        connection = self._owners.pop(channel, None)
+        if connection is None:
+            return
+
+        connection.channels.discard(channel)
+        await connection.send(f'PART #{channel}')
+        if not connection.channels and len(self._connections) > self.shards:
+            await self._remove_shard(connection)
+
+    def _connection_for(self, channel: str | None) -> Connection:
+        connection = self._owners.get(channel) if channel else None
+        return connection or next(iter(self._connections.values()))
+
+    def connected(self, channel: str | None = None) -> bool:
+        """Whether the connection ``send`` would use for ``channel`` is up."""
+        return bool(self._connections) and self._connection_for(channel).connected
+
+    async def send(self, command: str, channel: str | None = None) -> None:
+        await self._connection_for(channel).send(command)
+
+    async def wait_closed(self) -> None:
+        await self._closed.wait()
+
+    async def close(self) -> None:
+        if self._join_task:
+            self._join_task.cancel()
+            await asyncio.gather(self._join_task, return_exceptions=True)
+        await asyncio.gather(*(connection.close() for connection in self._connections.values()))
+        self._closed.set()
@@ -1,24 +1,89 @@
+import threading
 import time
+from enum import Enum
+from typing import Hashable
+
+
+class BucketType(Enum):
+    GLOBAL = 'global'
+    CHANNEL = 'channel'
+    USER = 'user'
+
+
+def bucket_key(bucket: BucketType, command: str, channel: str, user: str) -> tuple:
+    """The cooldown key of a command use. ``USER`` buckets are per user per channel."""
+    if bucket is BucketType.GLOBAL:
+        return command,
+    if bucket is BucketType.USER:
+        return command, channel, user
+    return command, channel
 
 
 class CommandCooldown:
-    def __init__(self):
-        self.cooldowns = {}
+    """Cooldowns for every command, channel and user in one bounded table.
+
+    Each key allows ``rate`` uses per ``per`` seconds and is stored as a single
+    timestamp (the generic cell rate algorithm), so checking and consuming is one
+    O(1) call under a lock. Keys are kept in last-use order; expired keys are
+    evicted from the front as new uses come in, and the table never grows past
+    ``max_entries``.
+    """
+
+    def __init__(self, max_entries: int = 100_000) -> None:
+        self.max_entries = max_entries
+        self._tats: dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    def consume(self, key: Hashable, rate: int, per: float) -> float:
+        """Use ``key`` if it is off cooldown.
+
+        Returns 0.0 when the use was allowed and recorded, otherwise the number of
+        seconds until it will be.
+        """
+        if per <= 0:
+            return 0.0
+
+        interval = per / rate
+        with self._lock:
+            now = time.monotonic()
+            tat = self._tats.get(key, now)
+            if tat < now:
+                tat = now
+
+            retry_after = tat - (per - interval) - now
+            if retry_after > 0:
+                return retry_after
+
+            self._tats.pop(key, None)
+            self._tats[key] = tat + interval
+            self._evict(now)
+            return 0.0
 
-    def can_use_command(self, channel, command, cooldown_duration):
-        current_time = time.time()
-        channel = self.cooldowns.get(channel, {})
+    def remaining(self, key: Hashable, rate: int, per: float) -> float:
+        with self._lock:
+            tat = self._tats.get(key)
+            if tat is None:
+                return 0.0
+            return max(tat - (per - per / rate) - time.monotonic(), 0.0)
 
-        if channel:
-            last_used_time = channel.get(command, 0)
+    def reset(self, key: Hashable) -> None:
+        with self._lock:
+            self._tats.pop(key, None)
 
-            if current_time - last_used_time < cooldown_duration:
-                return False
-        return True
+    def clear(self) -> None:
+        with self._lock:
+            self._tats.clear()
 
-    def update_command_cooldown(self, channel, command):
-        self.cooldowns[channel] = {}
-        self.cooldowns[channel][command] = time.time()
+    def _evict(self, now: float) -> None:
+        tats = self._tats
+        while tats:
+            key = next(iter(tats))
+            if tats[key] > now and len(tats) <= self.max_entries:
+                break
+            del tats[key]
 
 
 command_cooldown_manager = CommandCooldown()
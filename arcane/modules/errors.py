@@ -15,3 +15,36 @@ class HTTPException(Exception):
         self.extra = extra
 
         super().__init__(self.message)
+
+
+class APIError(HTTPException):
+    """An upstream API request failed. ``transient`` errors are worth retrying."""
+    transient = False
+
+
+class NotFoundError(APIError):
+    pass
+
+
+class UpstreamUnavailableError(APIError):
+    transient = True
+
+
+class APITimeoutError(APIError):
+    transient = True
+
+
+class RateLimitedError(APIError):
+    transient = True
+
+    def __init__(self, message: str, *, retry_after: float | None = None, **kwargs) -> None:
+        super().__init__(message, **kwargs)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(APIError):
+    pass
+
+
+class ThrottledError(APIError):
+    """The request was not let through the local rate limiter in time."""
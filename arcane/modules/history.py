@@ -0,0 +1,133 @@
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    from arcane.dataclasses import Message
+
+
+class ChannelHistory:
+    """The last ``capacity`` messages of one channel, indexed by author."""
+
+    __slots__ = ('capacity', '_messages', '_authors')
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._messages: deque['Message'] = deque()
+        self._authors: dict[str, deque['Message']] = {}
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __iter__(self) -> Iterator['Message']:
+        return iter(self._messages)
+
+    def append(self, message: 'Message') -> 'Message | None':
+        """Add ``message`` and return the message it pushed out, if any."""
+        evicted = self.popleft() if len(self._messages) >= self.capacity else None
+        self._messages.append(message)
+        author = message.author.name
+        messages = self._authors.get(author)
+        if messages is None:
+            messages = self._authors[author] = deque()
+        messages.append(message)
+        return evicted
+
+    def popleft(self) -> 'Message':
+        message = self._messages.popleft()
+        author = message.author.name
+        messages = self._authors[author]
+        messages.popleft()
+        if not messages:
+            del self._authors[author]
+        return message
+
+    def recent(self, count: int | None = None) -> list['Message']:
+        return _last(self._messages, count)
+
+    def by_author(self, author: str, count: int | None = None) -> list['Message']:
+        return _last(self._authors.get(author, ()), count)
+
+
+def _last(messages, count: int | None) -> list['Message']:
+    if count is None or count >= len(messages):
+        return list(messages)
+    if count <= 0:
+        return []
+    return [messages[index] for index in range(len(messages) - count, len(messages))]
+
+
+class MessageHistory:
+    """Recent chat kept per channel in fixed-size rings.
+
+    Messages are indexed by id across all channels and by author within each
+    channel. Once ``max_messages`` are held in total, the oldest message of the
+    least recently active channel is dropped first, so quiet channels give up their
+    history before busy ones.
+    """
+
+    def __init__(self, per_channel: int, max_messages: int) -> None:
+        self.per_channel = per_channel
+        self.max_messages = max_messages
+        self._channels: OrderedDict[str, ChannelHistory] = OrderedDict()
+        self._ids: dict[str, 'Message'] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, message_id: str) -> bool:
+        return message_id in self._ids
+
+    def add(self, message: 'Message') -> None:
+        name = message.channel.name
+        channel = self._channels.get(name)
+        if channel is None:
+            channel = self._channels[name] = ChannelHistory(self.per_channel)
+        else:
+            self._channels.move_to_end(name)
+
+        evicted = channel.append(message)
+        if evicted is None:
+            self._size += 1
+        else:
+            self._forget(evicted)
+        if message.id:
+            self._ids[message.id] = message
+
+        while self._size > self.max_messages:
+            oldest_name, oldest = next(iter(self._channels.items()))
+            self._forget(oldest.popleft())
+            self._size -= 1
+            if not oldest:
+                del self._channels[oldest_name]
+
+    def _forget(self, message: 'Message') -> None:
+        if message.id and self._ids.get(message.id) is message:
+            del self._ids[message.id]
+
+    def get(self, message_id: str) -> 'Message | None':
+        return self._ids.get(message_id)
+
+    def channel(self, name: str) -> ChannelHistory | None:
+        return self._channels.get(name)
+
+    def recent(self, channel: str, count: int | None = None) -> list['Message']:
+        history = self._channels.get(channel)
+        return history.recent(count) if history else []
+
+    def by_author(self, channel: str, author: str, count: int | None = None) -> list['Message']:
+        history = self._channels.get(channel)
+        return history.by_author(author, count) if history else []
+
+    def remove_channel(self, name: str) -> None:
+        history = self._channels.pop(name, None)
+        if history is None:
+            return
+        for message in history:
+            self._forget(message)
+        self._size -= len(history)
+
+    def clear(self) -> None:
+        self._channels.clear()
+        self._ids.clear()
+        self._size = 0
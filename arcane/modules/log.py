@@ -0,0 +1,147 @@
+import copy
+import json
+import logging
+import queue
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+
+from rich.markup import escape
+
+from arcane.modules import printt
+from arcane.settings import BASE_DIR, DEBUG, LOG_LEVEL, LOG_FILE, LOG_CONSOLE, CHAT_LOG_SAMPLE
+
+logger = logging.getLogger('arcane')
+chat = logging.getLogger('arcane.chat')
+irc = logging.getLogger('arcane.irc')
+
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+_LEVEL_STYLES = {
+    'DEBUG': '[dim][.]',
+    'INFO': '[bold green][?]',
+    'WARNING': '[bold yellow][!]',
+    'ERROR': '[bold red][!]',
+    'CRITICAL': '[bold red][!]',
+}
+
+_listener: QueueListener | None = None
+_traceback_formatter = logging.Formatter()
+
+
+def fields(record: logging.LogRecord) -> dict:
+    """The structured fields passed to a log call with ``extra``."""
+    return {key: value for key, value in vars(record).items() if key not in _RESERVED}
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments and render the traceback now, but leave formatting
+        # to the listener's handlers so fields and exceptions stay separate.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            **fields(record),
+        }
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ConsoleHandler(logging.Handler):
+    """Renders records with rich; chat lines keep the old coloured layout."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if record.name == chat.name:
+                channel = record.channel
+                user = record.user
+                color = record.color or 'white'
+                printt.printt(
+                    f'[bold][blue][{record.timestamp}][/blue] '
+                    f'[purple3][@[link=https://twitch.tv/{channel}]{channel}][/link][/purple3] '
+                    f'[{color}][link=https://twitch.tv/{user}]{escape(record.display_name)}[/link][/{color}][/]: '
+                    f'[white]{escape(record.getMessage())}', highlight=False)
+                return
+
+            message = record.getMessage()
+            if record.exc_text:
+                message = f'{message}\n{record.exc_text}'
+            printt.printt(f'{_LEVEL_STYLES.get(record.levelname, "[bold]")} [white]{escape(message)}[/]',
+                          highlight=False)
+        except Exception:
+            self.handleError(record)
+
+
+class ChannelSampler(logging.Filter):
+    """Keeps ``rate`` of the chat records of every channel, spread evenly.
+
+    Runs in the calling thread before the record is queued, so dropped lines cost
+    one dict update.
+    """
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+        self._credit: dict[str, float] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1.0:
+            return True
+
+        channel = getattr(record, 'channel', None)
+        credit = self._credit.get(channel, 1.0) + self.rate
+        if credit >= 1.0:
+            self._credit[channel] = credit - 1.0
+            return True
+        self._credit[channel] = credit
+        return False
+
+
+def start(path: str | None = LOG_FILE) -> None:
+    """Install the queue handler and start the listener thread. Later calls do nothing."""
+    global _listener
+    if _listener is not None:
+        return
+
+    handlers = []
+    if path:
+        log_path = Path(path)
+        if not log_path.is_absolute():
+            log_path = BASE_DIR / log_path
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = RotatingFileHandler(log_path, maxBytes=10 * 1024 * 1024, backupCount=5, encoding='utf-8')
+        file_handler.setFormatter(JSONFormatter())
+        handlers.append(file_handler)
+    if LOG_CONSOLE:
+        handlers.append(ConsoleHandler())
+
+    records = queue.SimpleQueue()
+    logger.addHandler(_QueueHandler(records))
+    logger.setLevel(logging.DEBUG if DEBUG else LOG_LEVEL)
+    logger.propagate = False
+    chat.addFilter(ChannelSampler(CHAT_LOG_SAMPLE))
+
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
@@ -0,0 +1,171 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable
+
+from arcane.modules import log
+from arcane.modules.ratelimit import BucketRegistry, SharedTokenBucket, TokenBucket
+
+# https://dev.twitch.tv/docs/irc/#rate-limits
+USER_LIMIT = (20, 30.0)
+GLOBAL_LIMIT = (100, 30.0)
+CHANNEL_LIMIT = (1, 1.0)
+# How often a channel whose connection is down is checked again, and how long one send may wait.
+RECONNECT_POLL = 1.0
+SEND_TIMEOUT = 5.0
+
+
+class OutboundMessage:
+    __slots__ = ('channel', 'content', 'command', 'recipient', 'reply_to', 'created_at', 'ttl')
+
+    def __init__(
+        self, channel: str, content: str, command: str, ttl: float | None = None,
+        recipient: str | None = None, reply_to: str | None = None
+    ) -> None:
+        self.channel = channel
+        self.content = content
+        self.command = command
+        self.recipient = recipient
+        self.reply_to = reply_to
+        self.created_at = time.monotonic()
+        self.ttl = ttl
+
+    def __repr__(self):
+        return f'<OutboundMessage channel: {self.channel}, content: {self.content}>'
+
+    @property
+    def expired(self) -> bool:
+        return self.ttl is not None and time.monotonic() - self.created_at > self.ttl
+
+
+class OutboundScheduler:
+    """Queues chat messages per channel and sends them within Twitch's rate limits.
+
+    Channels are drained round-robin, one message per channel per pass. Every message
+    counts against the account-wide limit; messages in channels where the bot is not
+    a moderator also count against the user limit and a one-per-second per-channel
+    limit. A message identical to one already queued for the same channel, recipient
+    and reply parent is dropped. Channels whose connection is down keep their queue
+    and are skipped until it is back, so one reconnecting shard never holds up the
+    others.
+    """
+
+    def __init__(
+        self, send: Callable[[str, str], Awaitable[None]], connected: Callable[[str], bool] | None = None
+    ) -> None:
+        self._send = send
+        self._connected = connected or (lambda channel: True)
+        self._queues: dict[str, deque[OutboundMessage]] = {}
+        self._ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._user_bucket: TokenBucket | SharedTokenBucket = TokenBucket(*USER_LIMIT)
+        self._global_bucket: TokenBucket | SharedTokenBucket = TokenBucket(*GLOBAL_LIMIT)
+        self._channel_buckets: dict[str, TokenBucket] = {}
+        self.moderator_channels: set[str] = set()
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def share_limits(self, buckets: BucketRegistry) -> None:
+        """Draw the user and account-wide limits from ``buckets``, shared with the other workers.
+
+        Channel limits stay local, since every channel belongs to one worker.
+        """
+        self._user_bucket = SharedTokenBucket(buckets, 'chat:user', *USER_LIMIT)
+        self._global_bucket = SharedTokenBucket(buckets, 'chat:global', *GLOBAL_LIMIT)
+
+    def set_moderator(self, channel: str, is_moderator: bool) -> None:
+        if is_moderator:
+            self.moderator_channels.add(channel)
+        else:
+            self.moderator_channels.discard(channel)
+
+    def enqueue(
+        self, channel: str, content: str, command: str, ttl: float | None = None,
+        recipient: str | None = None, reply_to: str | None = None
+    ) -> None:
+        queue = self._queues.get(channel)
+        if queue is None:
+            queue = self._queues[channel] = deque()
+        elif any(pending.content == content and pending.recipient == recipient and pending.reply_to == reply_to
+                 for pending in queue):
+            return
+
+        queue.append(OutboundMessage(channel, content, command, ttl, recipient, reply_to))
+        self._ready.set()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _channel_bucket(self, channel: str) -> TokenBucket:
+        bucket = self._channel_buckets.get(channel)
+        if bucket is None:
+            bucket = self._channel_buckets[channel] = TokenBucket(*CHANNEL_LIMIT)
+        return bucket
+
+    async def _acquire(self, channel: str) -> None:
+        if channel not in self.moderator_channels:
+            await self._user_bucket.acquire()
+            await self._channel_bucket(channel).acquire()
+        await self._global_bucket.acquire()
+
+    async def _run(self) -> None:
+        while True:
+            if not self._queues:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            self._ready.clear()
+            sent = False
+            wait = None
+            for channel in list(self._queues):
+                queue = self._queues.get(channel)
+                while queue and queue[0].expired:
+                    queue.popleft()
+                if not queue:
+                    self._queues.pop(channel, None)
+                    continue
+
+                if not self._connected(channel):
+                    wait = RECONNECT_POLL if wait is None else min(wait, RECONNECT_POLL)
+                    continue
+
+                if channel not in self.moderator_channels:
+                    delay = self._channel_bucket(channel).delay()
+                    if delay:
+                        wait = delay if wait is None else min(wait, delay)
+                        continue
+
+                await self._acquire(channel)
+                message = queue.popleft()
+                if not queue:
+                    self._queues.pop(channel, None)
+                if message.expired:
+                    continue
+
+                sent = True
+                try:
+                    await asyncio.wait_for(self._send(message.command, channel), SEND_TIMEOUT)
+                except (ConnectionError, TimeoutError) as e:
+                    # The socket dropped under us; the connection reconnects and the
+                    # message is retried from the head of its queue unless it expired meanwhile.
+                    if message.expired:
+                        continue
+                    self._queues.setdefault(channel, deque()).appendleft(message)
+                    log.logger.warning('Failed to send a message to #%s, requeued: %r', channel, e)
+                except Exception as e:
+                    log.logger.error('Failed to send a message to #%s: %s', channel, e)
+
+            if not sent and wait is not None:
+                try:
+                    await asyncio.wait_for(self._ready.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
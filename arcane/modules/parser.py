@@ -1,48 +1,148 @@
-from typing import Match
-
-from arcane.modules.regex import REGEX
-
-
-async def get_tags(message: Match) -> dict | None:
-    try:
-        tags = message.group('tags')
-        tags_dict = {}
-        for data in tags.split(';'):
-            variable = data.split('=')
-            if variable[1].isnumeric():
-                variable[1] = int(variable[1])
-            tags_dict[variable[0]] = variable[1]
-        return tags_dict
-    except Exception:
+_TAG_ESCAPES = {':': ';', 's': ' ', '\\': '\\', 'r': '\r', 'n': '\n'}
+
+
+class Line:
+    __slots__ = ('raw', '_raw_tags', '_tags', 'prefix', 'action', 'params')
+
+    def __init__(self, raw: str, raw_tags: str | None, prefix: str | None, action: str | None,
+                 params: list[str]) -> None:
+        self.raw = raw
+        self._raw_tags = raw_tags
+        self._tags: dict[str, str] | None = None
+        self.prefix = prefix
+        self.action = action
+        self.params = params
+
+    def __repr__(self):
+        return f'<Line action: {self.action}, prefix: {self.prefix}, params: {self.params}>'
+
+    @property
+    def raw_tags(self) -> str | None:
+        """The undecoded tag section, without the leading ``@``."""
+        return self._raw_tags
+
+    @property
+    def tags(self) -> dict[str, str]:
+        """The decoded tags, built on first access."""
+        if self._tags is None:
+            self._tags = parse_tags(self._raw_tags) if self._raw_tags else {}
+        return self._tags
+
+    def get_tag(self, key: str) -> str | None:
+        if self._tags is not None:
+            return self._tags.get(key)
+        return find_tag(self._raw_tags, key) if self._raw_tags else None
+
+    @property
+    def author(self) -> str | None:
+        """The nickname part of the prefix (``nick!user@host``)."""
+        if not self.prefix:
+            return None
+        end = self.prefix.find('!')
+        return self.prefix if end == -1 else self.prefix[:end]
+
+    @property
+    def channel(self) -> str | None:
+        """The channel name without the leading ``#``, if the first parameter is a channel."""
+        if self.params and self.params[0].startswith('#'):
+            return self.params[0][1:]
         return None
 
+    @property
+    def content(self) -> str | None:
+        """Everything after the channel parameter, joined back with spaces."""
+        if len(self.params) < 2:
+            return None
+        if len(self.params) == 2:
+            return self.params[1]
+        return ' '.join(self.params[1:])
+
+
+def unescape_tag_value(value: str) -> str:
+    if '\\' not in value:
+        return value
+
+    result = []
+    i = 0
+    length = len(value)
+    while i < length:
+        char = value[i]
+        if char == '\\':
+            i += 1
+            if i < length:
+                char = value[i]
+                result.append(_TAG_ESCAPES.get(char, char))
+        else:
+            result.append(char)
+        i += 1
+    return ''.join(result)
+
+
+def parse_tags(raw: str) -> dict[str, str]:
+    tags = {}
+    for part in raw.split(';'):
+        key, sep, value = part.partition('=')
+        tags[key] = unescape_tag_value(value) if sep else ''
+    return tags
+
+
+def find_tag(raw: str, key: str) -> str | None:
+    """Look up a single tag in an undecoded tag section without building a dict."""
+    needle = key + '='
+    if raw.startswith(needle):
+        start = len(needle)
+    else:
+        start = raw.find(';' + needle)
+        if start == -1:
+            return None
+        start += len(needle) + 1
+
+    end = raw.find(';', start)
+    return unescape_tag_value(raw[start:] if end == -1 else raw[start:end])
+
 
-async def parser(message: str) -> tuple:
-    try:
-        regex_template = REGEX['ping'] if message.startswith('PING') else REGEX['data']
-        message_data = regex_template.match(message)
-        tags = await get_tags(message_data)
+def parse_line(raw: str) -> Line:
+    """Parse a single IRCv3 line in one pass over the string."""
+    raw_tags = None
+    prefix = None
+    pos = 0
+    length = len(raw)
 
-        try:
-            action = message_data.group('action')
-        except Exception:
-            action = 'PING'
+    if raw.startswith('@'):
+        end = raw.find(' ')
+        if end == -1:
+            return Line(raw, raw[1:], None, None, [])
+        raw_tags = raw[1:end]
+        pos = end + 1
+        while pos < length and raw[pos] == ' ':
+            pos += 1
 
-        try:
-            data = message_data.group('data')
-        except Exception:
-            data = None
+    if pos < length and raw[pos] == ':':
+        end = raw.find(' ', pos)
+        if end == -1:
+            return Line(raw, raw_tags, raw[pos + 1:], None, [])
+        prefix = raw[pos + 1:end]
+        pos = end + 1
+        while pos < length and raw[pos] == ' ':
+            pos += 1
 
-        try:
-            content = message_data.group('content')
-        except Exception:
-            content = None
+    end = raw.find(' ', pos)
+    if end == -1:
+        return Line(raw, raw_tags, prefix, raw[pos:] or None, [])
+    action = raw[pos:end]
+    pos = end + 1
 
-        try:
-            channel = message_data.group('channel')
-        except Exception:
-            channel = None
+    params = []
+    while pos < length:
+        if raw[pos] == ':':
+            params.append(raw[pos + 1:])
+            break
+        end = raw.find(' ', pos)
+        if end == -1:
+            params.append(raw[pos:])
+            break
+        if end > pos:
+            params.append(raw[pos:end])
+        pos = end + 1
 
-        return tags, action, data, content, channel
-    except Exception:
-        pass
+    return Line(raw, raw_tags, prefix, action, params)
@@ -0,0 +1,120 @@
+import asyncio
+import time
+from typing import TYPE_CHECKING
+
+from arcane.models import channel_repository
+from arcane.modules import log
+from arcane.modules.api import valorant
+from arcane.settings import VALORANT_DEADLINE
+
+if TYPE_CHECKING:
+    from arcane import Arcane
+
+TICK = 5.0
+# Cache endpoints a warm refreshes; the interval is kept short enough that none of them expires.
+WARMED_ENDPOINTS = ('mmr', 'matches')
+
+
+class WarmState:
+    __slots__ = ('riot_id', 'interval', 'next_at', 'last_match_id', 'task')
+
+    def __init__(self, riot_id: str, interval: float) -> None:
+        self.riot_id = riot_id
+        self.interval = interval
+        self.next_at = 0.0
+        self.last_match_id: str | None = None
+        self.task: asyncio.Task | None = None
+
+    def __repr__(self):
+        return f'<WarmState riot_id: {self.riot_id}, interval: {self.interval}>'
+
+
+class StatsPrewarmer:
+    """Keeps the Valorant stats of live streamers warm in the API cache.
+
+    Every channel that is live according to the stream poller and has a Riot ID is
+    refreshed in the background, so ``!rank``, ``!lg`` and ``!wl`` are served from
+    fresh cache entries rather than stale ones. A refresh that finds a new match
+    resets the channel's interval to ``min_interval``; refreshes without one double
+    it up to ``max_interval``.
+
+    Each warm runs as its own task and the next one is due ``interval`` seconds
+    after it started. A due warm starts within a tick and finishes within the
+    Valorant deadline, so both intervals are capped at the shortest TTL of the
+    warmed endpoints minus a tick and the deadline, and an entry is always
+    refreshed before it goes stale.
+    """
+
+    def __init__(self, bot: 'Arcane', min_interval: float, max_interval: float, concurrency: int = 4) -> None:
+        self._bot = bot
+        ttl = min(valorant.cache_ttls[endpoint][0] for endpoint in WARMED_ENDPOINTS)
+        self.max_interval = min(max_interval, ttl - TICK - VALORANT_DEADLINE)
+        self.min_interval = min(min_interval, self.max_interval)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._states: dict[str, WarmState] = {}
+        self._task: asyncio.Task | None = None
+
+    def get(self, riot_id: str) -> WarmState | None:
+        return self._states.get(riot_id.lower())
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        tasks = [state.task for state in self._states.values() if state.task]
+        if self._task:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _targets(self) -> dict[str, str]:
+        """Riot IDs to keep warm, keyed case-insensitively; channels sharing one are refreshed once."""
+        targets = {}
+        for channel in self._bot.streams.live_channels():
+            row = channel_repository.get(channel)
+            if row and row.riot_id and '#' in row.riot_id:
+                targets[row.riot_id.lower()] = row.riot_id
+        return targets
+
+    async def tick(self) -> None:
+        targets = self._targets()
+        for key in list(self._states):
+            if key not in targets:
+                state = self._states.pop(key)
+                if state.task:
+                    state.task.cancel()
+
+        now = time.monotonic()
+        for key, riot_id in targets.items():
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = WarmState(riot_id, self.min_interval)
+            if state.next_at <= now and (state.task is None or state.task.done()):
+                state.task = asyncio.create_task(self._warm(state, now))
+
+    async def _warm(self, state: WarmState, started: float) -> None:
+        async with self._semaphore:
+            try:
+                match_id = await valorant.warm(state.riot_id)
+            except Exception as e:
+                log.logger.warning('Failed to warm stats for %s: %s', state.riot_id, e)
+                match_id = None
+
+        if match_id is not None and match_id != state.last_match_id:
+            if state.last_match_id is not None:
+                state.interval = self.min_interval
+            state.last_match_id = match_id
+        else:
+            state.interval = min(state.interval * 2, self.max_interval)
+        state.next_at = started + state.interval
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                await self._bot.parse_error(e)
+            await asyncio.sleep(TICK)
@@ -0,0 +1,266 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Hashable
+
+
+class TokenBucket:
+    """Token bucket that never lets more than ``limit`` acquisitions through in any ``per`` seconds.
+
+    ``burst`` tokens are available up front and the remaining ``limit - burst`` are
+    refilled evenly over the window, so a full burst followed by a steady stream
+    still stays within the limit.
+    """
+
+    __slots__ = ('capacity', 'rate', '_tokens', '_updated')
+
+    def __init__(self, limit: int, per: float, burst: int | None = None) -> None:
+        burst = max(limit // 4 if burst is None else burst, 1)
+        self.capacity: float = float(burst)
+        self.rate: float = (limit - burst if limit > burst else limit) / per
+        self._tokens: float = self.capacity
+        self._updated: float = time.monotonic()
+
+    def __repr__(self):
+        return f'<TokenBucket capacity: {self.capacity}, rate: {self.rate:.3f}/s, tokens: {self.tokens:.2f}>'
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def delay(self, tokens: float = 1) -> float:
+        """Seconds until ``tokens`` can be taken, 0 if they are available now."""
+        self._refill()
+        missing = tokens - self._tokens
+        return missing / self.rate if missing > 0 else 0.0
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1) -> None:
+        while not self.try_acquire(tokens):
+            await asyncio.sleep(self.delay(tokens))
+
+
+class BucketRegistry:
+    """Named token buckets shared by several processes through a multiprocessing manager.
+
+    The manager serves every client connection from its own thread, so the
+    buckets are only touched under one lock.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, name: str, limit: int, per: float, burst: int | None = None, tokens: float = 1) -> float:
+        """Take ``tokens`` from bucket ``name`` and return 0 if it has them, otherwise the seconds until it will."""
+        with self._lock:
+            bucket = self._buckets.get(name)
+            if bucket is None:
+                bucket = self._buckets[name] = TokenBucket(limit, per, burst)
+            if bucket.try_acquire(tokens):
+                return 0.0
+            return bucket.delay(tokens)
+
+
+class SharedTokenBucket:
+    """``TokenBucket.acquire`` against a bucket kept in a ``BucketRegistry`` in another process.
+
+    Every check is a blocking round trip to the manager, so it is made from a thread.
+    """
+
+    __slots__ = ('name', 'limit', 'per', 'burst', '_registry')
+
+    def __init__(self, registry: BucketRegistry, name: str, limit: int, per: float, burst: int | None = None) -> None:
+        self.name = name
+        self.limit = limit
+        self.per = per
+        self.burst = burst
+        self._registry = registry
+
+    def __repr__(self):
+        return f'<SharedTokenBucket name: {self.name}, limit: {self.limit}/{self.per:g}s>'
+
+    async def acquire(self, tokens: float = 1) -> None:
+        while True:
+            delay = await asyncio.to_thread(self._registry.reserve, self.name, self.limit, self.per, self.burst, tokens)
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+
+class RequestScheduler:
+    """Hands out slots for upstream requests in priority order within a rate limit.
+
+    Waiting requests are ordered by priority class, then by arrival. Once the
+    upstream reports its quota through ``update``, that quota decides until it
+    resets, and ``BACKGROUND`` requests leave the last ``reserve`` fraction of it
+    to ``INTERACTIVE`` ones. Without a known quota a ``TokenBucket`` paces
+    requests to ``limit`` per ``per`` seconds. A waiting request can be raised to a
+    more urgent class with ``promote``.
+
+    At most ``max_queue`` requests wait: a full queue drops its lowest-priority
+    request for a more urgent one, or turns the new one away. When several
+    processes use the same quota, ``share_quota`` keeps each to its share of it.
+    """
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+    def __init__(self, limit: int, per: float, reserve: float = 0.2, max_queue: int = 100) -> None:
+        self.limit = limit
+        self.per = per
+        self.reserve = reserve
+        self.max_queue = max_queue
+        self.rejected = 0
+        self.workers = 1
+        self._bucket = TokenBucket(limit, per)
+        self._remaining: int | None = None
+        self._reset_at = 0.0
+        # [priority, arrival, future, key] heap entries; lists so promote can change the priority.
+        self._queue: list[list] = []
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def __repr__(self):
+        return f'<RequestScheduler limit: {self.limit}/{self.per:g}s, remaining: {self._remaining}, queued: {len(self._queue)}>'
+
+    def share_quota(self, workers: int) -> None:
+        """Use only a ``1 / workers`` share of the limit and of the reported quota."""
+        self.workers = max(workers, 1)
+        self._bucket = TokenBucket(max(self.limit // self.workers, 1), self.per)
+
+    def update(self, limit: int | None, remaining: int, reset_after: float) -> None:
+        """Adopt the quota reported by the upstream: ``remaining`` requests until ``reset_after`` seconds from now.
+
+        Within the same window the lower of the reported and the local count is
+        kept, since a response does not count the requests still in flight.
+        """
+        if limit and limit != self.limit:
+            self.limit = limit
+            self._bucket = TokenBucket(max(limit // self.workers, 1), self.per)
+        remaining //= self.workers
+        now = time.monotonic()
+        reset_at = now + reset_after
+        if self._remaining is not None and now < self._reset_at and reset_at <= self._reset_at + 1.0:
+            remaining = min(remaining, self._remaining)
+        self._remaining = remaining
+        self._reset_at = reset_at
+        self._wakeup.set()
+
+    def _delay(self, priority: int) -> float:
+        if self._remaining is not None:
+            now = time.monotonic()
+            if now >= self._reset_at:
+                self._remaining = None
+            elif self._remaining <= (int(self.limit * self.reserve) // self.workers if priority > self.INTERACTIVE else 0):
+                return self._reset_at - now
+            else:
+                return 0.0
+        return self._bucket.delay()
+
+    def _take(self) -> None:
+        self._bucket.try_acquire()
+        if self._remaining is not None:
+            self._remaining -= 1
+
+    def try_acquire(self, priority: int = INTERACTIVE) -> bool:
+        """Take a slot only if one is free now and no request of the same or higher priority is waiting."""
+        if (not self._queue or self._queue[0][0] > priority) and self._delay(priority) <= 0:
+            self._take()
+            return True
+        return False
+
+    async def acquire(self, priority: int = INTERACTIVE, timeout: float | None = None, key: Hashable = None) -> bool:
+        """Wait up to ``timeout`` seconds for a slot. False if none was granted in time or the queue was full.
+
+        ``key`` identifies the waiting request to ``promote``.
+        """
+        if self.try_acquire(priority):
+            return True
+        if timeout is not None and timeout <= 0:
+            self.rejected += 1
+            return False
+
+        if len(self._queue) >= self.max_queue:
+            self._queue = [entry for entry in self._queue if not entry[2].done()]
+            heapq.heapify(self._queue)
+        if len(self._queue) >= self.max_queue:
+            worst = max(self._queue)
+            if worst[0] <= priority:
+                self.rejected += 1
+                return False
+            self._queue.remove(worst)
+            heapq.heapify(self._queue)
+            worst[2].set_result(False)
+            self.rejected += 1
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, [priority, next(self._counter), future, key])
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except TimeoutError:
+            self.rejected += 1
+            return False
+
+    def promote(self, key: Hashable, priority: int) -> None:
+        """Move the waiting request ``key`` up to ``priority`` if that is more urgent than its own."""
+        for entry in self._queue:
+            if entry[3] == key and priority < entry[0] and not entry[2].done():
+                entry[0] = priority
+                heapq.heapify(self._queue)
+                self._wakeup.set()
+                return
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for _, _, future, _ in self._queue:
+            if not future.done():
+                future.set_result(False)
+        self._queue.clear()
+
+    async def _run(self) -> None:
+        while True:
+            while self._queue and self._queue[0][2].done():
+                heapq.heappop(self._queue)
+
+            self._wakeup.clear()
+            if not self._queue:
+                await self._wakeup.wait()
+                continue
+
+            priority, _, future, _ = self._queue[0]
+            delay = self._delay(priority)
+            if delay > 0:
+                # Sleep until the slot frees up, or until a more urgent request or a quota update arrives.
+                try:
+                    async with asyncio.timeout(delay):
+                        await self._wakeup.wait()
+                except TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._queue)
+            self._take()
+            future.set_result(True)
@@ -0,0 +1,96 @@
+import random
+import time
+from collections import deque
+
+
+def backoff(attempt: int, base: float = 0.25, cap: float = 4.0) -> float:
+    """Exponential backoff with full jitter for retry ``attempt`` (0-based)."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Fails calls fast while an upstream keeps failing.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    ``allow`` refuses calls for ``reset_timeout`` seconds. Then a single probe is
+    let through (half-open): its success closes the circuit, its failure opens it
+    again. A probe that never reports back is replaced after another
+    ``reset_timeout``.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: float | None = None
+        self._probe_at: float | None = None
+
+    def __repr__(self):
+        return f'<CircuitBreaker state: {self.state}, failures: {self.failures}>'
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    @property
+    def retry_after(self) -> float:
+        if self._opened_at is None:
+            return 0.0
+        return max(self._opened_at + self.reset_timeout - time.monotonic(), 0.0)
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.OPEN:
+            return False
+
+        now = time.monotonic()
+        if self._probe_at is not None and now - self._probe_at < self.reset_timeout:
+            return False
+        self._probe_at = now
+        return True
+
+    def release(self) -> None:
+        """Give back a probe that ``allow`` let through but that was never sent."""
+        self._probe_at = None
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._probe_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probe_at is not None or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._probe_at = None
+
+
+class LatencyTracker:
+    """Latencies of the last ``window`` successful calls."""
+
+    def __init__(self, window: int = 100, min_samples: int = 20) -> None:
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> float | None:
+        """The ``fraction`` quantile, or None until ``min_samples`` calls were seen."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
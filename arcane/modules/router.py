@@ -0,0 +1,81 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from arcane.dataclasses import Command
+
+_END = ''
+
+
+class PrefixTrie:
+    """Character trie over a set of command prefixes, matched longest-first."""
+
+    def __init__(self, prefixes: list[str]) -> None:
+        self.prefixes = list(prefixes)
+        self._root: dict = {}
+        for prefix in self.prefixes:
+            node = self._root
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node[_END] = True
+
+    def match(self, content: str) -> int:
+        """Length of the longest prefix ``content`` starts with, 0 if none."""
+        node = self._root
+        length = 0
+        for index, char in enumerate(content):
+            node = node.get(char)
+            if node is None:
+                break
+            if _END in node:
+                length = index + 1
+        return length
+
+
+class CommandRouter:
+    """Resolves chat messages to commands.
+
+    Command names, aliases and hidden commands all live in one index pointing at
+    the ``Command`` object; subcommands hang off that object. A message is checked
+    against the channel's prefixes, or the default ones when the channel has none,
+    before anything is split, so ordinary chat costs a walk of at most the longest
+    prefix.
+    """
+
+    def __init__(self, prefixes: list[str]) -> None:
+        self._default = PrefixTrie(prefixes)
+        self._channels: dict[str, PrefixTrie] = {}
+        self._index: dict[str, 'Command'] = {}
+
+    @property
+    def prefixes(self) -> list[str]:
+        return self._default.prefixes
+
+    def add(self, name: str, command: 'Command') -> None:
+        self._index[name] = command
+
+    def remove(self, name: str) -> None:
+        self._index.pop(name, None)
+
+    def get(self, name: str) -> 'Command | None':
+        return self._index.get(name)
+
+    def prefixes_for(self, channel: str) -> list[str]:
+        return self._channels.get(channel, self._default).prefixes
+
+    def set_channel_prefixes(self, channel: str, prefixes: list[str] | None) -> None:
+        if prefixes:
+            self._channels[channel] = PrefixTrie(prefixes)
+        else:
+            self._channels.pop(channel, None)
+
+    def match(self, channel: str, content: str) -> tuple['Command', list[str]] | None:
+        """The command ``content`` invokes and its tokens, or None for ordinary chat."""
+        length = self._channels.get(channel, self._default).match(content)
+        if not length:
+            return None
+
+        end = content.find(' ', length)
+        command = self._index.get(content[length:] if end == -1 else content[length:end])
+        if command is None:
+            return None
+        return command, content.split(' ')
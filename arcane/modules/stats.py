@@ -0,0 +1,192 @@
+import bisect
+import time
+from array import array
+from datetime import datetime
+
+WIN, DRAW, LOSS = 1, 0, -1
+RESULT_LABELS = {WIN: 'W', DRAW: 'D', LOSS: 'L'}
+SUMMARY_COLUMNS = ('result', 'kills', 'deaths', 'assists', 'head', 'body', 'leg', 'damage', 'rounds')
+
+
+def parse_started_at(value: str) -> float:
+    """Epoch seconds of an API timestamp such as ``2023-09-01T18:30:12.345Z``."""
+    return datetime.fromisoformat(value).timestamp()
+
+
+class MatchTable:
+    """Lifetime match history of one player stored column by column.
+
+    Rows are ordered oldest first, so a rolling window ("since N hours ago") is a
+    binary search for its first row, and aggregates are sums and counts over array
+    slices. Agent and map names are interned into small pools and stored as
+    indexes.
+    """
+
+    def __init__(self) -> None:
+        self.match_ids: list[str] = []
+        self.started_at = array('d')
+        self.result = array('b')
+        self.red_score = array('H')
+        self.blue_score = array('H')
+        self.kills = array('H')
+        self.deaths = array('H')
+        self.assists = array('H')
+        self.head = array('I')
+        self.body = array('I')
+        self.leg = array('I')
+        self.damage = array('I')
+        self.rounds = array('H')
+        self.agent = array('H')
+        self.map = array('H')
+        self.agents: list[str] = []
+        self.maps: list[str] = []
+        self._agent_ids: dict[str, int] = {}
+        self._map_ids: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.match_ids)
+
+    def __repr__(self):
+        return f'<MatchTable matches: {len(self)}>'
+
+    @classmethod
+    def from_matches(cls, matches: list[dict]) -> 'MatchTable':
+        """Build a table from the ``data`` list of a lifetime matches response."""
+        table = cls()
+        rows = sorted(matches, key=lambda match: match['meta']['started_at'])
+        for match in rows:
+            table.append(match)
+        return table
+
+    @staticmethod
+    def compact(match: dict) -> tuple[str, float, dict]:
+        """``(match_id, started_at, payload)`` keeping only the fields a table reads."""
+        meta = match['meta']
+        stats = match['stats']
+        payload = {
+            'meta': {'id': meta['id'], 'map': {'name': meta['map']['name']}, 'started_at': meta['started_at']},
+            'stats': {
+                'team': stats['team'],
+                'character': {'name': stats['character']['name']},
+                'kills': stats['kills'],
+                'deaths': stats['deaths'],
+                'assists': stats['assists'],
+                'shots': stats['shots'],
+                'damage': {'made': stats['damage']['made']},
+            },
+            'teams': match['teams'],
+        }
+        return meta['id'], parse_started_at(meta['started_at']), payload
+
+    @staticmethod
+    def _intern(value: str, pool: list[str], ids: dict[str, int]) -> int:
+        index = ids.get(value)
+        if index is None:
+            index = ids[value] = len(pool)
+            pool.append(value)
+        return index
+
+    def append(self, match: dict) -> None:
+        """Add one match payload. Matches must be appended oldest first."""
+        meta = match['meta']
+        stats = match['stats']
+        teams = match['teams']
+        shots = stats['shots']
+
+        red_score = teams.get('red') or 0
+        blue_score = teams.get('blue') or 0
+        if stats['team'].lower() == 'red':
+            team_score, enemy_score = red_score, blue_score
+        else:
+            team_score, enemy_score = blue_score, red_score
+
+        self.match_ids.append(meta['id'])
+        self.started_at.append(parse_started_at(meta['started_at']))
+        self.result.append(WIN if team_score > enemy_score else LOSS if team_score < enemy_score else DRAW)
+        self.red_score.append(red_score)
+        self.blue_score.append(blue_score)
+        self.kills.append(stats['kills'])
+        self.deaths.append(stats['deaths'])
+        self.assists.append(stats['assists'])
+        self.head.append(shots.get('head', 0))
+        self.body.append(shots.get('body', 0))
+        self.leg.append(shots.get('leg', 0))
+        self.damage.append(stats['damage']['made'])
+        self.rounds.append(red_score + blue_score)
+        self.agent.append(self._intern(stats['character']['name'], self.agents, self._agent_ids))
+        self.map.append(self._intern(meta['map']['name'], self.maps, self._map_ids))
+
+    def since(self, timestamp: float) -> int:
+        """Index of the first match started at or after ``timestamp``."""
+        return bisect.bisect_left(self.started_at, timestamp)
+
+    def last_hours(self, hours: float) -> int:
+        return self.since(time.time() - hours * 60 * 60)
+
+    def record(self, start: int = 0) -> tuple[int, int, int]:
+        """Wins, losses and draws from row ``start`` to the latest match."""
+        results = self.result[start:]
+        return results.count(WIN), results.count(LOSS), results.count(DRAW)
+
+    def summary(self, start: int = 0, rows: list[int] | None = None) -> dict:
+        """Record and combat stats over the rows from ``start`` to the latest match, or over ``rows``."""
+        if rows is None:
+            columns = {name: getattr(self, name)[start:] for name in SUMMARY_COLUMNS}
+        else:
+            columns = {name: [getattr(self, name)[row] for row in rows] for name in SUMMARY_COLUMNS}
+
+        results = columns['result']
+        kills = sum(columns['kills'])
+        deaths = sum(columns['deaths'])
+        head = sum(columns['head'])
+        shots = head + sum(columns['body']) + sum(columns['leg'])
+        rounds = sum(columns['rounds'])
+        return {
+            'matches': len(results),
+            'wins': results.count(WIN),
+            'losses': results.count(LOSS),
+            'draws': results.count(DRAW),
+            'kills': kills,
+            'deaths': deaths,
+            'assists': sum(columns['assists']),
+            'kdr': round(kills / deaths, 1) if deaths else float(kills),
+            'hs': round(head / shots * 100) if shots else 0,
+            'adr': round(sum(columns['damage']) / rounds, 1) if rounds else 0.0,
+        }
+
+    def split(self, column: str, start: int = 0) -> dict[str, dict]:
+        """``summary`` per agent (``column='agent'``) or per map (``column='map'``) from row ``start``.
+
+        Groups are ordered by number of matches, most played first.
+        """
+        pool = self.agents if column == 'agent' else self.maps
+        groups: dict[int, list[int]] = {}
+        for row, value in enumerate(getattr(self, column)[start:], start):
+            groups.setdefault(value, []).append(row)
+        ordered = sorted(groups.items(), key=lambda group: len(group[1]), reverse=True)
+        return {pool[value]: self.summary(rows=rows) for value, rows in ordered}
+
+    def last_game(self) -> dict | None:
+        if not self.match_ids:
+            return None
+
+        row = len(self) - 1
+        kills = self.kills[row]
+        deaths = self.deaths[row]
+        head = self.head[row]
+        shots = head + self.body[row] + self.leg[row]
+        rounds = self.rounds[row]
+        return {
+            'match_id': self.match_ids[row],
+            'map_name': self.maps[self.map[row]],
+            'win_status': RESULT_LABELS[self.result[row]],
+            'red_score': self.red_score[row],
+            'blue_score': self.blue_score[row],
+            'character': self.agents[self.agent[row]],
+            'kills': kills,
+            'deaths': deaths,
+            'assists': self.assists[row],
+            'kdr': str(round(kills / deaths, 1) if deaths else float(kills)),
+            'hs': round(head / shots * 100) if shots else 0,
+            'adr': str(round(self.damage[row] / rounds, 1) if rounds else 0.0),
+        }
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+import pytz
+from dateutil.parser import parse as parse_datetime
+
+from arcane.modules.api import twitch
+from arcane.modules.api.twitch import helix_batched, HELIX_BATCH_SIZE
+
+if TYPE_CHECKING:
+    from arcane import Arcane
+
+
+class StreamState:
+    __slots__ = ('channel', 'live', 'data', 'started_at', 'title', 'game_name', 'viewer_count', 'updated_at')
+
+    def __init__(self, channel: str, data: dict | None = None) -> None:
+        self.channel: str = channel
+        self.live: bool = data is not None
+        self.data: dict | None = data
+        self.started_at: datetime | None = None
+        self.title: str | None = None
+        self.game_name: str | None = None
+        self.viewer_count: int = 0
+        self.updated_at: float = time.monotonic()
+
+        if data:
+            self.started_at = parse_datetime(data['started_at']).replace(tzinfo=pytz.UTC)
+            self.title = data.get('title')
+            self.game_name = data.get('game_name')
+            self.viewer_count = data.get('viewer_count', 0)
+
+    def __repr__(self):
+        return f'<StreamState channel: {self.channel}, live: {self.live}, started_at: {self.started_at}>'
+
+    @property
+    def uptime(self) -> float | None:
+        if not self.started_at:
+            return None
+        return (datetime.now(pytz.UTC) - self.started_at).total_seconds()
+
+
+class StreamPoller:
+    """Keeps an in-memory live/offline index of every channel the bot has joined.
+
+    All channels are refreshed every ``interval`` seconds with one Helix request per
+    100 channels. Transitions call ``event_stream_online`` / ``event_stream_offline``
+    on the bot. Reads are synchronous and never hit the API. While the poller runs,
+    ``twitch.get_stream`` and ``twitch.get_stream_started_at`` answer tracked
+    channels from it.
+    """
+
+    def __init__(self, bot: 'Arcane', interval: float) -> None:
+        self._bot = bot
+        self.interval = interval
+        self._states: dict[str, StreamState] = {}
+        self._task: asyncio.Task | None = None
+
+    def get(self, channel: str) -> StreamState | None:
+        return self._states.get(channel)
+
+    def is_live(self, channel: str) -> bool:
+        state = self._states.get(channel)
+        return bool(state and state.live)
+
+    def started_at(self, channel: str) -> datetime | None:
+        state = self._states.get(channel)
+        return state.started_at if state else None
+
+    def live_channels(self) -> list[str]:
+        return [channel for channel, state in self._states.items() if state.live]
+
+    def start(self) -> None:
+        twitch.live_index = self
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if twitch.live_index is self:
+            twitch.live_index = None
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def poll(self) -> None:
+        channels = list(self._bot.channels)
+        for channel in list(self._states):
+            if channel not in channels:
+                del self._states[channel]
+
+        batches = await helix_batched('streams', 'user_login', channels, [('first', str(HELIX_BATCH_SIZE))])
+        for batch, response in batches:
+            if response is None:
+                continue
+
+            streams = {stream['user_login'].lower(): stream for stream in response['data']}
+            for channel in batch:
+                previous = self._states.get(channel)
+                state = self._states[channel] = StreamState(channel, streams.get(channel))
+                if previous is None or previous.live == state.live:
+                    continue
+                if state.live:
+                    await self._bot.event_stream_online(state)
+                else:
+                    await self._bot.event_stream_offline(state)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll()
+            except Exception as e:
+                await self._bot.parse_error(e)
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,165 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import zlib
+from multiprocessing.managers import BaseManager
+from pathlib import Path
+
+from arcane.modules import log, printt
+from arcane.settings import LOG_FILE
+
+RESTART_DELAY = 5.0
+
+_channel_store = None
+_buckets = None
+_cooldowns = None
+_inboxes: dict[int, queue.Queue] = {}
+
+
+def _get_inbox(index: int) -> queue.Queue:
+    return _inboxes.setdefault(index, queue.Queue())
+
+
+def _get_channel_store():
+    global _channel_store
+    if _channel_store is None:
+        from arcane.models import ChannelStore
+        _channel_store = ChannelStore()
+    return _channel_store
+
+
+def _get_buckets():
+    global _buckets
+    if _buckets is None:
+        from arcane.modules.ratelimit import BucketRegistry
+        _buckets = BucketRegistry()
+    return _buckets
+
+
+def _get_cooldowns():
+    global _cooldowns
+    if _cooldowns is None:
+        from arcane.modules.cooldowns import CommandCooldown
+        _cooldowns = CommandCooldown()
+    return _cooldowns
+
+
+class SupervisorManager(BaseManager):
+    pass
+
+
+SupervisorManager.register('channel_store', callable=_get_channel_store)
+SupervisorManager.register('buckets', callable=_get_buckets)
+SupervisorManager.register('cooldowns', callable=_get_cooldowns)
+SupervisorManager.register('inbox', callable=_get_inbox)
+
+
+def owner(channel: str, workers: int) -> int:
+    """The index of the worker that owns ``channel``, stable across restarts and processes."""
+    return zlib.crc32(channel.encode()) % workers
+
+
+def partition(channels: list[str], index: int, workers: int) -> list[str]:
+    """The channels owned by worker ``index``."""
+    return [channel for channel in channels if owner(channel, workers) == index]
+
+
+async def _apply(bot, operation: str, name: str, args: tuple) -> None:
+    from arcane.models import channel_repository
+
+    try:
+        await channel_repository.apply(operation, name, *args)
+        if operation == 'create':
+            await bot.join_channel(name)
+        elif operation == 'update' and 'prefix' in args[0]:
+            bot.router.set_channel_prefixes(name, channel_repository.get(name).prefixes)
+        elif operation == 'delete':
+            await bot.part_channel(name)
+    except Exception as e:
+        await bot.parse_error(e)
+
+
+def _listen(bot, inbox) -> None:
+    """Apply the channel writes other workers send to this one, on the bot's event loop."""
+    while True:
+        operation, name, args = inbox.get()
+        asyncio.run_coroutine_threadsafe(_apply(bot, operation, name, args), bot._loop)
+
+
+def run_worker(index: int, workers: int, address, authkey: bytes) -> None:
+    from arcane import bot
+    from arcane.models import channel_repository
+    from arcane.modules.api import valorant
+
+    # Rotating files cannot be shared between processes, so each worker logs to its own.
+    log.start(str(Path(LOG_FILE).with_stem(f'{Path(LOG_FILE).stem}-{index}')) if LOG_FILE else None)
+
+    manager = SupervisorManager(address=address, authkey=authkey)
+    manager.connect()
+
+    # Every worker logs in as the same account, so its chat and JOIN limits are shared
+    # through the manager. Channels are partitioned, so channel and user cooldowns never
+    # cross workers and stay in the worker's own table; global cooldowns are shared.
+    buckets = manager.buckets()
+    bot._outbound.share_limits(buckets)
+    bot._pool.share_limits(buckets)
+    bot.global_cooldowns = manager.cooldowns()
+    # The API key is shared too; each worker keeps to its share of the quota.
+    valorant.scheduler.share_quota(workers)
+
+    inboxes = [manager.inbox(worker) for worker in range(workers)]
+    channel_repository.store = manager.channel_store()
+    channel_repository.owns = lambda name: owner(name, workers) == index
+    channel_repository.forward = lambda operation, name, *args: inboxes[owner(name, workers)].put(
+        (operation, name, args))
+    bot.channels = partition(bot.channels, index, workers)
+    threading.Thread(target=_listen, args=(bot, inboxes[index]), name='arcane-inbox', daemon=True).start()
+
+    printt.info(f'Worker {index} (pid {os.getpid()}) owns {len(bot.channels)} channel(s).')
+    bot.run()
+
+
+def supervise(workers: int) -> None:
+    """Run ``workers`` bot processes and restart any that exit until interrupted.
+
+    Each worker owns a fixed partition of the channels and keeps their cooldowns
+    and settings in memory. A channel write made by another worker is sent to the
+    owner's inbox, and all database writes go through a manager process owned by
+    the supervisor. The manager also holds the Twitch chat and JOIN limits and the
+    global cooldowns, which apply to the account rather than to one worker.
+    """
+    context = multiprocessing.get_context('spawn')
+    authkey = os.urandom(32)
+    manager = SupervisorManager(authkey=authkey, ctx=context)
+    manager.start()
+
+    processes: dict[int, multiprocessing.Process] = {}
+
+    def spawn(index: int) -> None:
+        process = context.Process(
+            target=run_worker, args=(index, workers, manager.address, authkey),
+            name=f'arcane-worker-{index}', daemon=False)
+        process.start()
+        processes[index] = process
+
+    try:
+        for index in range(workers):
+            spawn(index)
+
+        while True:
+            time.sleep(RESTART_DELAY)
+            for index, process in list(processes.items()):
+                if not process.is_alive():
+                    printt.error(f'Worker {index} exited with code {process.exitcode}, restarting.')
+                    spawn(index)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes.values():
+            process.terminate()
+        for process in processes.values():
+            process.join()
+        manager.shutdown()
@@ -0,0 +1,54 @@
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class WorkerPool:
+    """Runs a handler over submitted items with bounded concurrency.
+
+    Items sharing a key are handled one at a time in submission order, items with
+    different keys run concurrently up to ``concurrency``. ``submit`` waits once
+    ``max_pending`` items are queued, which pushes back on the producer.
+    """
+
+    def __init__(self, handler: Callable[[Any], Awaitable[None]], concurrency: int, max_pending: int) -> None:
+        self._handler = handler
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._slots = asyncio.Semaphore(max_pending)
+        self._pending: dict[Hashable, deque] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._pending.values())
+
+    async def submit(self, key: Hashable, item: Any) -> None:
+        await self._slots.acquire()
+
+        queue = self._pending.get(key)
+        if queue is not None:
+            queue.append(item)
+            return
+
+        self._pending[key] = deque((item,))
+        task = asyncio.create_task(self._drain(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _drain(self, key: Hashable) -> None:
+        queue = self._pending[key]
+        try:
+            while queue:
+                item = queue.popleft()
+                try:
+                    async with self._semaphore:
+                        await self._handler(item)
+                finally:
+                    self._slots.release()
+        finally:
+            del self._pending[key]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
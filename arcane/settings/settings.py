@@ -17,6 +17,26 @@ CLIENT_ID = environ['CLIENT_ID']
 # Bot settings
 DEBUG = ast.literal_eval(environ['DEBUG'])
 OWNER_ID = str(environ['OWNER_ID'])
+PREFIXES = environ.get('PREFIXES', '!').split()
+WORKERS = int(environ.get('WORKERS', 16))
+QUEUE_SIZE = int(environ.get('QUEUE_SIZE', 1000))
+MESSAGE_TTL = float(environ.get('MESSAGE_TTL', 15.0))
+STREAM_POLL_INTERVAL = float(environ.get('STREAM_POLL_INTERVAL', 60.0))
+PREWARM_MIN_INTERVAL = float(environ.get('PREWARM_MIN_INTERVAL', 30.0))
+PREWARM_MAX_INTERVAL = float(environ.get('PREWARM_MAX_INTERVAL', 45.0))
+VALORANT_DEADLINE = float(environ.get('VALORANT_DEADLINE', 8.0))
+VALORANT_HEDGE = ast.literal_eval(environ.get('VALORANT_HEDGE', 'False'))
+VALORANT_RATE_LIMIT = int(environ.get('VALORANT_RATE_LIMIT', 30))
+SHARDS = int(environ.get('SHARDS', 1))
+CHANNELS_PER_SHARD = int(environ.get('CHANNELS_PER_SHARD', 100))
+HISTORY_SIZE = int(environ.get('HISTORY_SIZE', 100))
+HISTORY_BUDGET = int(environ.get('HISTORY_BUDGET', 100_000))
+
+# Logging settings
+LOG_LEVEL = environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FILE = environ.get('LOG_FILE', 'logs/arcane.log')
+LOG_CONSOLE = ast.literal_eval(environ.get('LOG_CONSOLE', 'True'))
+CHAT_LOG_SAMPLE = float(environ.get('CHAT_LOG_SAMPLE', 1.0))
 
 # DB settings
 DB_NAME = environ['DB_NAME']
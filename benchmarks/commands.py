@@ -0,0 +1,163 @@
+"""Per-invocation cost of a command: runtime signature inspection against the compiled plan.
+
+The "before" path is ``Command.run`` as it was before invocation plans were
+compiled: ``inspect.getfullargspec`` and ``__annotations__`` are read and the
+message is re-split on every call. It is kept here verbatim. Both paths run the
+same no-op handlers with a zero cooldown, so only the command machinery is
+measured.
+"""
+import inspect
+
+from benchmarks import measure, report, run
+from arcane.dataclasses import Channel, Command, Message, User
+from arcane.modules.cooldowns import CommandCooldown
+from arcane.modules.router import CommandRouter
+
+CALLS = 50_000
+
+
+class LegacyCommand(Command):
+    """``Command`` with the ``run`` it had before ``_compile``; registration is shared."""
+
+    __slots__ = ()
+
+    def __call__(self, func):
+        self.func = func
+        self._cooldown_key = f'{func.__module__}.{func.__qualname__}'
+        return self
+
+    def subcommand(self, *args, **kwargs):
+        return LegacySubCommand(self, *args, **kwargs)
+
+    async def execute_command(self, message: Message, tokens: list[str] | None = None) -> None:
+        await self.run(message)
+
+    async def run(self, message: Message, tokens: list[str] | None = None, start: int = 1) -> None:
+        args = message.content[len(self._bot.prefix):].split(' ')[1:]
+
+        args_name = inspect.getfullargspec(self.func)[0][1:]
+
+        if len(args) > len(args_name):
+            args[len(args_name)-1] = ' '.join(args[len(args_name)-1:])
+
+            args = args[:len(args_name)]
+
+        ann = self.func.__annotations__
+
+        for x in range(len(args_name)):
+            try:
+                v = args[x]
+                k = args_name[x]
+
+                if not isinstance(v, ann[k]):
+                    v = ann[k](v)
+
+                args[x] = v
+            except IndexError:
+                break
+
+        if self._subcommands:
+            try:
+                subcomm = args.pop(0).split(' ')[0]
+            except Exception:
+                if self.consume_cooldown(message):
+                    await self.func(message, *args)
+                return
+            if subcomm in self._subcommands:
+                c = message.content.split(' ')
+                content = ' '.join(c[1:])
+                await self._subcommands[subcomm].run(Message(
+                    content=content,
+                    author=message.author,
+                    channel=message.channel,
+                    bot=self._bot,
+                    tags=message.tags,
+                ))
+            else:
+                if self.consume_cooldown(message):
+                    await self.func(message, *args)
+        else:
+            try:
+                if self.consume_cooldown(message):
+                    await self.func(message, *args)
+            except TypeError as e:
+                if len(args) < len(args_name):
+                    raise Exception(f'Not enough arguments for {self._name}, required arguments:'
+                                    f' {", ".join(args_name)}')
+                else:
+                    raise e
+
+
+class LegacySubCommand(LegacyCommand):
+    __slots__ = ('_parent',)
+
+    def __init__(self, *args, **kwargs) -> None:
+        self._parent = args[0]
+        self._name = kwargs.get('name')
+        self._aliases = kwargs.get('aliases', [])
+        self._permissions = kwargs.get('permissions', [])
+        self._cooldown = kwargs.get('cooldown', 15.0)
+        self._cooldown_rate = kwargs.get('cooldown_rate', 1)
+        self._cooldown_bucket = self._parent._cooldown_bucket
+        self._bot = self._parent._bot
+        self._subcommands = {}
+        self._parent._subcommands[self._name] = self
+
+
+class StandIn:
+    """The registries and cooldown table a ``Command`` reads from its bot."""
+
+    prefix = '!'
+
+    def __init__(self) -> None:
+        self.commands = {}
+        self.hidden_commands = {}
+        self.aliases = {}
+        self.router = CommandRouter(['!'])
+        self.cooldowns = CommandCooldown()
+
+
+def build(command: type[Command]) -> tuple[StandIn, Command, Command]:
+    bot = StandIn()
+
+    @command(bot, name='rank', cooldown=0)
+    async def rank(msg, name: str = None, count: int = 1) -> None:
+        assert count == 3
+
+    @command(bot, name='settings', cooldown=0)
+    async def settings(msg, subcommand: str = None) -> None:
+        pass
+
+    @settings.subcommand(name='riotid', cooldown=0)
+    async def riotid(msg, name_with_tag: str) -> None:
+        assert name_with_tag == 'Some Name#EUW'
+
+    return bot, rank, settings
+
+
+def invoke(command: Command, message: Message) -> None:
+    for _ in range(CALLS):
+        # The bot's PRIVMSG handler splits the message once and hands the tokens over.
+        run(command.execute_command(message, message.content.split(' ')))
+
+
+def main() -> None:
+    cases = (('rank', '!rank foo 3', '!rank foo 3'),
+             ('settings', '!settings riotid Some Name#EUW', '!settings riotid Some Name#EUW'),
+             ('settings', '!settings xx', '!settings xx (unknown subcommand)'))
+    timings = {}
+    for version, command_class in (('before', LegacyCommand), ('after', Command)):
+        bot, rank, settings = build(command_class)
+        commands = {'rank': rank, 'settings': settings}
+        for name, content, label in cases:
+            message = Message(content=content, author=User(name='viewer', channel='channel'),
+                              channel=Channel(name='channel'), bot=bot, tags=None)
+            timings[version, label] = measure(lambda: invoke(commands[name], message), CALLS)
+
+    print(f'{CALLS} invocations each\n')
+    for _, _, label in cases:
+        report(label, timings['before', label], timings['after', label])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Dispatch cost per line: the original ``if``/``elif`` chain against the handler table.
+
+Both paths get the corpus already parsed and every handler is a no-op coroutine,
+so only the cost of finding the handler is measured. The "before" path keeps the
+order of the chain the bot shipped with; the "after" path is
+``Arcane.action_handler`` itself, run against a stand-in bot.
+"""
+from benchmarks import load_corpus, measure, report, run
+from arcane.bot import Arcane
+from arcane.modules.parser import parse_line
+
+# Calls timed per sample; rare actions are replayed more often to reach it.
+CALLS = 200_000
+
+
+async def noop(*args) -> None:
+    pass
+
+
+async def chain(action: str, line) -> None:
+    """The original ``action_handler``, with every branch calling a no-op."""
+    try:
+        if not action:
+            return
+
+        elif action == 'PING':
+            await noop(line)
+
+        elif action == 'PRIVMSG':
+            await noop(line)
+
+        elif action == 'WHISPER':
+            await noop(line)
+
+        elif action == 'JOIN':
+            await noop(line)
+
+        elif action == 'PART':
+            await noop(line)
+
+        elif action == 'MODE':
+            await noop(line)
+
+        elif action == 'USERSTATE':
+            await noop(line)
+
+        elif action == 'ROOMSTATE':
+            await noop(line)
+
+        elif action == 'NOTICE':
+            await noop(line)
+
+        elif action == 'CLEARCHAT':
+            await noop(line)
+
+        elif action == 'HOSTTARGET':
+            await noop(line)
+
+        elif action == 'USERNOTICE':
+            await noop(line)
+
+        elif action == 'CAP':
+            return
+        else:
+            await noop(line)
+
+    except Exception as e:
+        await noop(e)
+
+
+class StandIn:
+    """Just enough of ``Arcane`` for ``action_handler``: the same handler keys, all no-ops."""
+
+    def __init__(self) -> None:
+        self._handlers = {action: noop for action in
+                          ('PING', 'PRIVMSG', 'WHISPER', 'JOIN', 'PART', 'MODE', 'USERSTATE', 'ROOMSTATE', 'NOTICE',
+                           'CLEARCHAT', 'HOSTTARGET', 'USERNOTICE', 'CAP')}
+        self._listeners = {}
+        self.parse_error = noop
+
+
+def before(lines: list, loops: int) -> None:
+    for _ in range(loops):
+        for line in lines:
+            run(chain(line.action, line))
+
+
+def after(bot: StandIn, lines: list, loops: int) -> None:
+    handler = Arcane.action_handler
+    for _ in range(loops):
+        for line in lines:
+            run(handler(bot, line))
+
+
+def main() -> None:
+    lines = [parse_line(raw) for raw in load_corpus()]
+    bot = StandIn()
+    print(f'{len(lines)} lines, ~{CALLS} calls per sample\n')
+
+    samples = {'whole corpus': lines}
+    for line in lines:
+        samples.setdefault(line.action, []).append(line)
+    for label, sample in samples.items():
+        loops = -(-CALLS // len(sample))
+        calls = len(sample) * loops
+        report(label, measure(lambda: before(sample, loops), calls), measure(lambda: after(bot, sample, loops), calls))
+
+
+if __name__ == '__main__':
+    main()
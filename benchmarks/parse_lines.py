@@ -0,0 +1,114 @@
+"""Parsing cost per line over the chat corpus: the two-regex path against ``parse_line``.
+
+The "before" path is the parser the bot shipped with: ``REGEX['data']`` and
+``get_tags`` for every line, then ``REGEX['message']`` again for PRIVMSG, with the
+tags split and read eagerly for the message's author. It is kept here verbatim so
+the comparison can be re-run after the old code is gone.
+"""
+import re
+
+from benchmarks import load_corpus, measure, report, run
+from arcane.dataclasses import Message
+from arcane.modules.parser import parse_line
+
+LOOPS = 20
+
+DATA = re.compile(
+    r'^(?:@(?P<tags>\S+)\s)?:(?P<data>\S+)(?:\s)'
+    r'(?P<action>[A-Z]+)(?:\s#)(?P<channel>\S+)'
+    r'(?:\s(?::)?(?P<content>.+))?')
+MESSAGE = re.compile(
+    r'^@(?P<tags>[^ ]+) :(?P<author>[^!]+).* '
+    r'PRIVMSG #(?P<channel>[^ ]+) '
+    r':(?P<message>[^\r]+)')
+PING = re.compile('PING (?P<content>.+)')
+
+
+async def get_tags(message) -> dict | None:
+    try:
+        tags = message.group('tags')
+        tags_dict = {}
+        for data in tags.split(';'):
+            variable = data.split('=')
+            if variable[1].isnumeric():
+                variable[1] = int(variable[1])
+            tags_dict[variable[0]] = variable[1]
+        return tags_dict
+    except Exception:
+        return None
+
+
+async def parser(message: str) -> tuple:
+    try:
+        regex_template = PING if message.startswith('PING') else DATA
+        message_data = regex_template.match(message)
+        tags = await get_tags(message_data)
+
+        try:
+            action = message_data.group('action')
+        except Exception:
+            action = 'PING'
+
+        try:
+            data = message_data.group('data')
+        except Exception:
+            data = None
+
+        try:
+            content = message_data.group('content')
+        except Exception:
+            content = None
+
+        try:
+            channel = message_data.group('channel')
+        except Exception:
+            channel = None
+
+        return tags, action, data, content, channel
+    except Exception:
+        pass
+
+
+def parse_message(msg: str) -> tuple | None:
+    """``Message.parse`` and the eager tag reads of ``User.__init__`` as they were."""
+    match = MESSAGE.match(msg)
+    if not match:
+        return None
+
+    tags = {}
+    for part in match['tags'].split(';'):
+        k, v = part.split('=', 1)
+        tags[k] = v
+    badges = tags.get('badges')
+    return (match['message'], match['author'], match['channel'], tags.get('user-id'), tags.get('display-name'),
+            tags.get('color'), tags.get('mod') == 1, tags.get('subscriber') == 1,
+            dict([badge.split('/') for badge in badges.split(',')]) if badges else None)
+
+
+def before(lines: list[str]) -> None:
+    for _ in range(LOOPS):
+        for line in lines:
+            _, action, _, _, _ = run(parser(line))
+            if action == 'PRIVMSG':
+                parse_message(line)
+
+
+def after(lines: list[str]) -> None:
+    for _ in range(LOOPS):
+        for line in lines:
+            parsed = parse_line(line)
+            if parsed.action == 'PRIVMSG':
+                Message.parse(None, parsed)
+
+
+def main() -> None:
+    lines = load_corpus()
+    privmsg = [line for line in lines if ' PRIVMSG #' in line]
+    print(f'{len(lines)} lines, {len(privmsg)} PRIVMSG, {LOOPS} loops\n')
+    for label, sample in (('whole corpus', lines), ('PRIVMSG only', privmsg)):
+        calls = len(sample) * LOOPS
+        report(label, measure(lambda: before(sample), calls), measure(lambda: after(sample), calls))
+
+
+if __name__ == '__main__':
+    main()
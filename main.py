@@ -27,15 +27,22 @@ def main():
 
     addchannel_parser = subparsers.add_parser('addchannel', help=command_descriptions['addchannel'])
     runbot_parser = subparsers.add_parser('run', help=command_descriptions['run'])
+    runbot_parser.add_argument('--workers', type=int, default=1,
+                               help='Number of bot processes to spread the channels over')
     removechannel_parser = subparsers.add_parser('removechannel', help=command_descriptions['removechannel'])
 
     args = parser.parse_args()
 
     try:
         selected_function = command_functions[args.command]
-        selected_function()
     except KeyError:
         printt.error('No argument selected')
+        return
+
+    if args.command == 'run':
+        selected_function(workers=args.workers)
+    else:
+        selected_function()
 
 
 if __name__ == '__main__':
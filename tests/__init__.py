@@ -0,0 +1,6 @@
+import os
+
+# The settings module needs these at import time; tests never talk to Twitch or a real database.
+for _key, _value in {'ACCESS_TOKEN': 'test', 'CLIENT_ID': 'test', 'DEBUG': 'False', 'OWNER_ID': '0',
+                     'DB_NAME': ':memory:', 'LOG_CONSOLE': 'False'}.items():
+    os.environ.setdefault(_key, _value)
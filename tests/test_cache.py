@@ -0,0 +1,54 @@
+import asyncio
+import unittest
+
+from arcane.modules.cache import TTLCache
+
+
+class GetOrFetchTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.cache = TTLCache()
+        self.calls = 0
+
+    async def fetch(self, value=None, error: Exception | None = None):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        if error:
+            raise error
+        return value, 1
+
+    async def test_concurrent_misses_share_one_fetch(self) -> None:
+        values = await asyncio.gather(*(
+            self.cache.get_or_fetch('foo', lambda: self.fetch(['foo']), ttl=60) for _ in range(5)))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(values, [['foo']] * 5)
+        self.assertEqual(await self.cache.get_or_fetch('foo', lambda: self.fetch(['bar']), ttl=60), ['foo'])
+        self.assertEqual(self.calls, 1)
+
+    async def test_shared_failure_is_raised_to_every_caller_and_not_kept(self) -> None:
+        results = await asyncio.gather(*(
+            self.cache.get_or_fetch('foo', lambda: self.fetch(error=ConnectionError('down')), ttl=60)
+            for _ in range(3)), return_exceptions=True)
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(isinstance(result, ConnectionError) for result in results))
+
+        self.assertEqual(await self.cache.get_or_fetch('foo', lambda: self.fetch(['foo']), ttl=60), ['foo'])
+        self.assertEqual(self.calls, 2)
+
+    async def test_uncacheable_value_is_shared_but_not_stored(self) -> None:
+        values = await asyncio.gather(*(
+            self.cache.get_or_fetch('foo', lambda: self.fetch(None), ttl=60, cacheable=lambda value: value is not None)
+            for _ in range(3)))
+        self.assertEqual((values, self.calls), ([None] * 3, 1))
+        self.assertNotIn('foo', self.cache)
+
+    async def test_cancelled_caller_does_not_cancel_the_shared_fetch(self) -> None:
+        first = asyncio.create_task(self.cache.get_or_fetch('foo', lambda: self.fetch(['foo']), ttl=60))
+        second = asyncio.create_task(self.cache.get_or_fetch('foo', lambda: self.fetch(['foo']), ttl=60))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        self.assertEqual(await second, ['foo'])
+        self.assertEqual(self.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+from aiohttp import web
+
+from arcane.modules import connection
+from arcane.modules.connection import ConnectionPool
+
+
+class FakeBot:
+    _token = 'token'
+    username = 'arcane'
+
+    def __init__(self, host: str) -> None:
+        self._host = host
+        self.lines = []
+
+    async def receive(self, line) -> None:
+        self.lines.append(line)
+
+
+class FakeIRCServer:
+    """A local websocket server speaking just enough IRC to watch a client reconnect.
+
+    ``drop_after_join`` closes the first connection once it has joined every
+    channel, and the next ``refuse`` handshakes are answered with a 503.
+    """
+
+    def __init__(self, drop_after_join: int = 0, refuse: int = 0) -> None:
+        self.drop_after_join = drop_after_join
+        self.refuse = refuse
+        self.sessions: list[list[str]] = []
+        self.handshakes: list[float] = []
+        self._runner: web.AppRunner | None = None
+        self.url = ''
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get('/', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f'ws://127.0.0.1:{port}/'
+
+    async def stop(self) -> None:
+        await self._runner.cleanup()
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        self.handshakes.append(time.monotonic())
+        if self.sessions and self.refuse:
+            self.refuse -= 1
+            return web.Response(status=503)
+
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        received: list[str] = []
+        self.sessions.append(received)
+        drop = len(self.sessions) == 1 and self.drop_after_join
+
+        async for message in websocket:
+            received.extend(line for line in message.data.split('\r\n') if line)
+            if drop and sum(line.startswith('JOIN') for line in received) >= self.drop_after_join:
+                await websocket.close()
+                break
+        return websocket
+
+
+class ReconnectTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = None
+        self.pool = None
+
+    async def asyncTearDown(self) -> None:
+        if self.pool:
+            await self.pool.close()
+        if self.server:
+            await self.server.stop()
+
+    async def start(self, server: FakeIRCServer, channels: list[str]) -> connection.Connection:
+        self.server = server
+        await server.start()
+        self.pool = ConnectionPool(FakeBot(server.url), shards=1, channels_per_shard=100)
+        await self.pool.start(channels)
+        return self.pool.connections[0]
+
+    async def wait_for_reconnect(self, conn: connection.Connection, timeout: float = 5.0) -> None:
+        async with asyncio.timeout(timeout):
+            while not conn.reconnects:
+                await asyncio.sleep(0.01)
+
+    async def test_reconnects_in_place_and_rejoins_channels(self) -> None:
+        conn = await self.start(FakeIRCServer(drop_after_join=2), ['alpha', 'beta'])
+        await self.wait_for_reconnect(conn)
+
+        self.assertIs(self.pool.connections[0], conn)
+        self.assertEqual(len(self.pool), 1)
+        self.assertEqual(conn.reconnects, 1)
+        self.assertLess(conn.last_reconnect, 1.0)
+
+        first, second = self.server.sessions
+        self.assertEqual(second[:2], ['PASS oauth:token', 'NICK arcane'])
+        self.assertEqual(sorted(line for line in second if line.startswith('JOIN')), ['JOIN #alpha', 'JOIN #beta'])
+        self.assertIs(self.pool.owner('alpha'), conn)
+
+    async def test_start_joins_channels_in_the_background(self) -> None:
+        channels = [f'channel{number}' for number in range(12)]
+        started = time.monotonic()
+        conn = await self.start(FakeIRCServer(), channels)
+
+        # Twelve JOINs take several seconds at the rate limit; start() only opens the socket.
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertTrue(conn.connected)
+        async with asyncio.timeout(5.0):
+            while sum(line.startswith('JOIN') for line in self.server.sessions[0]) < 5:
+                await asyncio.sleep(0.01)
+        self.assertLess(sum(line.startswith('JOIN') for line in self.server.sessions[0]), len(channels))
+        self.assertLess(len(conn.channels), len(channels))
+
+    async def test_send_during_outage_is_delivered_after_reconnect(self) -> None:
+        conn = await self.start(FakeIRCServer(drop_after_join=1, refuse=1), ['alpha'])
+        with mock.patch.object(connection, 'BACKOFF_BASE', 0.05):
+            async with asyncio.timeout(5.0):
+                while conn.connected:
+                    await asyncio.sleep(0.01)
+            await asyncio.wait_for(conn.send('PRIVMSG #alpha :still here'), 5.0)
+            await self.wait_for_reconnect(conn)
+
+        async with asyncio.timeout(5.0):
+            while 'PRIVMSG #alpha :still here' not in self.server.sessions[-1]:
+                await asyncio.sleep(0.01)
+
+    async def test_backs_off_exponentially_between_failed_attempts(self) -> None:
+        server = FakeIRCServer(drop_after_join=1, refuse=3)
+        with mock.patch.object(connection, 'BACKOFF_BASE', 0.05), \
+                mock.patch.object(connection.random, 'uniform', return_value=1.0):
+            conn = await self.start(server, ['alpha'])
+            await self.wait_for_reconnect(conn)
+
+        # The first handshake is the initial connect, the second the immediate reconnect,
+        # then one refused attempt after each delay: 0.05s, 0.1s and 0.2s.
+        gaps = [later - earlier for earlier, later in zip(server.handshakes[1:], server.handshakes[2:])]
+        self.assertEqual(len(gaps), 3)
+        for gap, delay in zip(gaps, (0.05, 0.1, 0.2)):
+            self.assertGreaterEqual(gap, delay)
+        self.assertEqual(len(server.sessions), 2)
+        self.assertEqual(sum(line.startswith('JOIN') for line in server.sessions[-1]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
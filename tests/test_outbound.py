@@ -0,0 +1,68 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from arcane.modules import outbound
+from arcane.modules.outbound import OutboundScheduler
+
+
+class OutboundReconnectTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.sent: list[tuple[str, str]] = []
+        self.up = {'alpha': False, 'beta': True}
+        self.scheduler = OutboundScheduler(self.send, lambda channel: self.up[channel])
+        self.scheduler.start()
+
+    async def asyncTearDown(self) -> None:
+        await self.scheduler.stop()
+
+    async def send(self, command: str, channel: str) -> None:
+        self.sent.append((channel, command))
+
+    async def wait_for_sent(self, channel: str, timeout: float = 3.0) -> None:
+        async with asyncio.timeout(timeout):
+            while not any(sent_channel == channel for sent_channel, _ in self.sent):
+                await asyncio.sleep(0.01)
+
+    async def test_down_connection_does_not_block_other_channels(self) -> None:
+        self.scheduler.enqueue('alpha', 'first', 'PRIVMSG #alpha :first')
+        self.scheduler.enqueue('beta', 'second', 'PRIVMSG #beta :second')
+        await self.wait_for_sent('beta')
+        self.assertEqual(self.sent, [('beta', 'PRIVMSG #beta :second')])
+        self.assertEqual(len(self.scheduler), 1)
+
+        self.up['alpha'] = True
+        with mock.patch.object(outbound, 'RECONNECT_POLL', 0.05):
+            self.scheduler.enqueue('beta', 'wake', 'PRIVMSG #beta :wake')
+            await self.wait_for_sent('alpha')
+        self.assertIn(('alpha', 'PRIVMSG #alpha :first'), self.sent)
+
+    async def test_message_expiring_while_its_connection_is_down_is_dropped(self) -> None:
+        with mock.patch.object(outbound, 'RECONNECT_POLL', 0.05):
+            self.scheduler.enqueue('alpha', 'stale', 'PRIVMSG #alpha :stale', ttl=0.1)
+            await asyncio.sleep(0.2)
+            self.up['alpha'] = True
+            self.scheduler.enqueue('alpha', 'fresh', 'PRIVMSG #alpha :fresh')
+            await self.wait_for_sent('alpha')
+        self.assertEqual(self.sent, [('alpha', 'PRIVMSG #alpha :fresh')])
+
+    async def test_send_stuck_on_a_reconnect_is_requeued(self) -> None:
+        release = asyncio.Event()
+
+        async def send(command: str, channel: str) -> None:
+            if not release.is_set():
+                await release.wait()
+            self.sent.append((channel, command))
+
+        self.scheduler._send = send
+        with mock.patch.object(outbound, 'SEND_TIMEOUT', 0.05):
+            self.scheduler.enqueue('beta', 'retry', 'PRIVMSG #beta :retry')
+            await asyncio.sleep(0.1)
+            self.assertEqual(len(self.scheduler), 1)
+            release.set()
+            await self.wait_for_sent('beta')
+        self.assertEqual(self.sent, [('beta', 'PRIVMSG #beta :retry')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from arcane.modules import prewarm
+from arcane.modules.prewarm import StatsPrewarmer, TICK
+from arcane.settings import VALORANT_DEADLINE
+
+
+class FakeStreams:
+    def __init__(self, channels: list[str]) -> None:
+        self.channels = channels
+
+    def live_channels(self) -> list[str]:
+        return self.channels
+
+
+class FakeBot:
+    def __init__(self, channels: list[str]) -> None:
+        self.streams = FakeStreams(channels)
+
+
+class FakeRow:
+    def __init__(self, riot_id: str) -> None:
+        self.riot_id = riot_id
+
+
+class PrewarmTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.release = asyncio.Event()
+        self.warmed: list[str] = []
+        self.bot = FakeBot(['alpha', 'beta'])
+        self.prewarmer = StatsPrewarmer(self.bot, min_interval=30.0, max_interval=120.0, concurrency=1)
+        patches = (
+            mock.patch.object(prewarm.channel_repository, 'get', lambda channel: FakeRow(f'{channel}#tag')),
+            mock.patch.object(prewarm.valorant, 'warm', self.warm),
+        )
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def asyncTearDown(self) -> None:
+        await self.prewarmer.stop()
+
+    async def warm(self, riot_id: str) -> str:
+        self.warmed.append(riot_id)
+        await self.release.wait()
+        return 'match'
+
+    def test_intervals_leave_room_for_a_tick_and_the_deadline(self) -> None:
+        ttl = min(prewarm.valorant.cache_ttls[endpoint][0] for endpoint in prewarm.WARMED_ENDPOINTS)
+        self.assertEqual(self.prewarmer.max_interval, ttl - TICK - VALORANT_DEADLINE)
+        self.assertLessEqual(self.prewarmer.min_interval, self.prewarmer.max_interval)
+
+    async def test_tick_does_not_wait_for_warms(self) -> None:
+        async with asyncio.timeout(1.0):
+            await self.prewarmer.tick()
+        await asyncio.sleep(0)
+        # The semaphore lets one warm run; the other waits without holding up the tick.
+        self.assertEqual(self.warmed, ['alpha#tag'])
+
+        async with asyncio.timeout(1.0):
+            await self.prewarmer.tick()
+        self.assertEqual(self.warmed, ['alpha#tag'])
+
+        self.release.set()
+        async with asyncio.timeout(1.0):
+            while len(self.warmed) < 2:
+                await asyncio.sleep(0.01)
+
+    async def test_next_warm_is_due_an_interval_after_the_last_one_started(self) -> None:
+        with mock.patch.object(prewarm.time, 'monotonic', return_value=1000.0):
+            await self.prewarmer.tick()
+        self.release.set()
+        state = self.prewarmer.get('alpha#tag')
+        await state.task
+        self.assertEqual(state.next_at, 1000.0 + state.interval)
+
+    async def test_channel_going_offline_cancels_its_warm(self) -> None:
+        await self.prewarmer.tick()
+        task = self.prewarmer.get('alpha#tag').task
+        self.bot.streams.channels = ['beta']
+        await self.prewarmer.tick()
+        await asyncio.gather(task, return_exceptions=True)
+        self.assertTrue(task.cancelled())
+        self.assertIsNone(self.prewarmer.get('alpha#tag'))
+
+
+if __name__ == '__main__':
+    unittest.main()
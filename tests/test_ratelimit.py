@@ -0,0 +1,53 @@
+import asyncio
+import time
+import unittest
+
+from arcane.modules.ratelimit import RequestScheduler, SharedTokenBucket
+from arcane.modules.supervisor import SupervisorManager
+
+
+class SharedTokenBucketTest(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.manager = SupervisorManager()
+        cls.manager.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.manager.shutdown()
+
+    async def test_workers_draw_from_one_bucket(self) -> None:
+        # Two proxies stand in for two workers: 2 tokens up front, then 8 per second between them.
+        first, second = (SharedTokenBucket(self.manager.buckets(), 'test', 10, 1.0, burst=2) for _ in range(2))
+
+        async def drain(bucket: SharedTokenBucket) -> None:
+            for _ in range(5):
+                await bucket.acquire()
+
+        started = time.monotonic()
+        await asyncio.gather(drain(first), drain(second))
+        self.assertGreaterEqual(time.monotonic() - started, 8 / 8)
+
+    async def test_global_cooldowns_are_shared(self) -> None:
+        first, second = self.manager.cooldowns(), self.manager.cooldowns()
+        self.assertEqual(first.consume(('test.command',), 1, 30.0), 0.0)
+        self.assertGreater(second.consume(('test.command',), 1, 30.0), 0.0)
+
+
+class RequestSchedulerShareTest(unittest.TestCase):
+    def test_each_worker_keeps_to_its_share_of_the_quota(self) -> None:
+        scheduler = RequestScheduler(limit=100, per=60.0, reserve=0.2)
+        scheduler.share_quota(4)
+        self.assertEqual(scheduler._bucket.capacity, 25 // 4)
+
+        scheduler.update(100, 40, 30.0)
+        self.assertEqual(scheduler._remaining, 10)
+        # The reserve is split too: background requests stop with 20 / 4 = 5 left.
+        for _ in range(5):
+            self.assertTrue(scheduler.try_acquire(RequestScheduler.BACKGROUND))
+        self.assertFalse(scheduler.try_acquire(RequestScheduler.BACKGROUND))
+        self.assertTrue(scheduler.try_acquire(RequestScheduler.INTERACTIVE))
+
+
+if __name__ == '__main__':
+    unittest.main()
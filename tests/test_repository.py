@@ -0,0 +1,68 @@
+import unittest
+
+from peewee import OperationalError
+
+from arcane.models.models import Channel
+from arcane.models.repository import ChannelRepository, ChannelStore
+
+
+class FailingStore(ChannelStore):
+    def __init__(self) -> None:
+        self.fail = False
+        self.writes: list[tuple] = []
+
+    def _persist(self, *write) -> None:
+        if self.fail:
+            raise OperationalError('database is locked')
+        self.writes.append(write)
+
+    def create(self, name: str, fields: dict) -> None:
+        self._persist('create', name, fields)
+
+    def update(self, name: str, fields: dict) -> None:
+        self._persist('update', name, fields)
+
+    def delete(self, name: str) -> None:
+        self._persist('delete', name)
+
+
+class ChannelRepositoryRollbackTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.repository = ChannelRepository()
+        self.repository.store = self.store = FailingStore()
+        await self.repository.create('alpha', riot_id='Old#EUW', prefix=None)
+        self.store.fail = True
+
+    async def asyncTearDown(self) -> None:
+        self.repository.close()
+
+    async def test_failed_create_is_undone(self) -> None:
+        with self.assertRaises(OperationalError):
+            await self.repository.create('beta')
+        self.assertNotIn('beta', self.repository)
+
+    async def test_failed_update_restores_previous_values(self) -> None:
+        with self.assertRaises(OperationalError):
+            await self.repository.update('alpha', riot_id='New#EUW', prefix='?')
+        channel = self.repository.get('alpha')
+        self.assertEqual((channel.riot_id, channel.prefix), ('Old#EUW', None))
+
+    async def test_failed_delete_restores_the_row(self) -> None:
+        channel = self.repository.get('alpha')
+        with self.assertRaises(OperationalError):
+            await self.repository.delete('alpha')
+        self.assertIs(self.repository.get('alpha'), channel)
+
+    async def test_forwarded_write_is_undone_when_it_fails(self) -> None:
+        with self.assertRaises(OperationalError):
+            await self.repository.apply('update', 'alpha', {'riot_id': 'New#EUW'})
+        self.assertEqual(self.repository.get('alpha').riot_id, 'Old#EUW')
+
+        self.store.fail = False
+        await self.repository.apply('update', 'alpha', {'riot_id': 'New#EUW'})
+        self.assertEqual(self.repository.get('alpha').riot_id, 'New#EUW')
+        self.assertIsInstance(self.repository.get('alpha'), Channel)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from arcane.modules.stats import MatchTable
+
+
+def match(match_id: str, started_at: str, agent: str, map_name: str, won: bool, kills: int, deaths: int) -> dict:
+    return {
+        'meta': {'id': match_id, 'map': {'name': map_name}, 'started_at': started_at},
+        'stats': {
+            'team': 'Red',
+            'character': {'name': agent},
+            'kills': kills,
+            'deaths': deaths,
+            'assists': 2,
+            'shots': {'head': 5, 'body': 10, 'leg': 5},
+            'damage': {'made': 2400},
+        },
+        'teams': {'red': 13 if won else 7, 'blue': 7 if won else 13},
+    }
+
+
+class MatchTableSplitTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.table = MatchTable.from_matches([
+            match('m1', '2023-09-01T10:00:00.000Z', 'Jett', 'Ascent', True, 20, 10),
+            match('m2', '2023-09-01T11:00:00.000Z', 'Sova', 'Bind', False, 10, 20),
+            match('m3', '2023-09-01T12:00:00.000Z', 'Jett', 'Bind', True, 30, 10),
+            match('m4', '2023-09-01T13:00:00.000Z', 'Jett', 'Ascent', False, 15, 15),
+        ])
+
+    def test_split_by_agent_orders_most_played_first(self) -> None:
+        split = self.table.split('agent')
+        self.assertEqual(list(split), ['Jett', 'Sova'])
+        self.assertEqual((split['Jett']['matches'], split['Jett']['wins'], split['Jett']['losses']), (3, 2, 1))
+        self.assertEqual(split['Jett']['kdr'], round(65 / 35, 1))
+        self.assertEqual(split['Sova']['losses'], 1)
+
+    def test_split_by_map_over_a_window(self) -> None:
+        split = self.table.split('map', self.table.since(MatchTable.compact(
+            match('m2', '2023-09-01T11:00:00.000Z', 'Sova', 'Bind', False, 10, 20))[1]))
+        self.assertEqual({name: info['matches'] for name, info in split.items()}, {'Bind': 2, 'Ascent': 1})
+        self.assertEqual(split['Bind']['wins'], 1)
+
+    def test_split_groups_sum_to_the_window_summary(self) -> None:
+        split = self.table.split('agent')
+        summary = self.table.summary()
+        for key in ('matches', 'wins', 'losses', 'kills', 'deaths', 'assists'):
+            self.assertEqual(sum(info[key] for info in split.values()), summary[key])
+
+
+if __name__ == '__main__':
+    unittest.main()